@@ -0,0 +1,64 @@
+"""
+    Benchmark de vazao do engine de Tomasulo (ciclos simulados por segundo)
+
+    Roda cada programa repetidamente ate completar (ou ate --max-cycles),
+    com historico completo (modo da GUI), no modo rapido sem historico e no
+    modo rapido pulando ciclos ociosos (event_driven).
+
+    Use:
+        python benchmarks/bench_engine.py
+        python benchmarks/bench_engine.py examples/test1.asm --seconds 2
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from simulator.loader import load_program
+from simulator.tomasulo_engine import TomasuloEngine
+
+MODES = {
+    'history': {},
+    'fast': {'record_history': False, 'log_events': False},
+    'event': {'record_history': False, 'log_events': False, 'event_driven': True},
+}
+
+
+def bench(program, options, seconds, max_cycles):
+    """Retorna ciclos/segundo simulando `program` por pelo menos `seconds`."""
+    cycles = 0
+    start = time.perf_counter()
+    while True:
+        engine = TomasuloEngine(**options)
+        engine.load_program(program)
+        engine.run_until_complete(max_cycles)
+        cycles += engine.cycle
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return cycles / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de ciclos/segundo do engine.")
+    parser.add_argument('paths', nargs='*',
+                        default=sorted(glob.glob(os.path.join(ROOT, 'examples', 'long_test*.asm'))))
+    parser.add_argument('--seconds', type=float, default=1.0, help="tempo por medicao")
+    parser.add_argument('--max-cycles', type=int, default=2000, help="limite de ciclos por execucao")
+    args = parser.parse_args(argv)
+
+    print(f"{'programa':40} {'modo':>8} {'ciclos/s':>12}")
+    for path in args.paths:
+        program = load_program(path)
+        for mode, options in MODES.items():
+            rate = bench(program, options, args.seconds, args.max_cycles)
+            print(f"{os.path.basename(path):40} {mode:>8} {rate:12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,9 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QLabel, QTableWidget, QTableWidgetItem,
-    QFileDialog, QGridLayout, QHeaderView, QTextEdit
+    QPushButton, QLabel, QTableView, QAbstractItemView,
+    QFileDialog, QGridLayout, QHeaderView, QPlainTextEdit, QComboBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QColor, QFont
 import time
 import sys
@@ -13,7 +13,28 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from src.simulator.tomasulo_engine import TomasuloEngine
-from src.simulator.instruction import parse_mips
+from src.simulator.loader import AsmError, load_program as load_asm
+from src.simulator.events import COMMIT, render as render_event
+
+# ============= RUN LOOP =============
+# Velocidades do RUN: (rotulo, segundos por ciclo); 0 = o mais rapido possivel
+RUN_SPEEDS = [
+    ("0.3 s/ciclo", 0.3),
+    ("0.1 s/ciclo", 0.1),
+    ("0.03 s/ciclo", 0.03),
+    ("Máxima", 0),
+]
+# Na velocidade maxima, cada tick do timer simula por no maximo este tempo
+# (o resto do tempo fica para a interface)...
+RUN_CHUNK_SECONDS = 0.015
+# ...e a interface e redesenhada no maximo a esta taxa, nao a cada ciclo
+REFRESH_SECONDS = 1 / 30
+# Linhas do console de eventos
+LOG_LINES = 20
+# Sem limite de ciclos o historico precisa ser limitado: journal dos ultimos
+# ciclos + keyframes esparsos (step_back continua alcancando qualquer ciclo)
+HISTORY_DEPTH = 2000
+KEYFRAME_INTERVAL = 500
 
 # ============= COLOR CONSTANTS =============
 # Main colors
@@ -66,12 +87,212 @@ COLOR_REG_WAITING_BG = "#ffcccc"
 COLOR_REG_WAITING_BORDER = "#ff6666"
 COLOR_REG_WAITING_TEXT = "#cc0000"
 
+# Program listing colors
+COLOR_PC_NEXT = COLOR_ROB_TAIL  # Next instruction to issue
+COLOR_PC_COMMITTED = "#d5f5e3"  # Committed recently (still in the event log)
+
 # Console colors
 COLOR_CONSOLE_BG = "#282c34"
 COLOR_CONSOLE_TEXT = "#ffffff"
 COLOR_CONSOLE_BORDER = "#21252b"
 
 
+# ============= TABLE MODELS =============
+class EngineTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela lido direto do estado do engine.
+
+    A view so pede data() das linhas visiveis, entao pintar custa o mesmo
+    com 8 ou 8000 entradas. Cada subclasse descreve uma linha com
+    row(r) -> (celulas, fundo, cor do texto, negrito); refresh() descarta
+    as linhas calculadas e avisa a view, que repinta so o que aparece.
+    """
+
+    HEADERS = ()
+
+    def __init__(self, engine, font=None):
+        super().__init__()
+        self.engine = engine
+        self.font = font
+        self.rows = 0
+        self.cache = {}
+        self.colors = {}
+
+    def count(self):
+        raise NotImplementedError
+
+    def row(self, r):
+        raise NotImplementedError
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        r = index.row()
+        row = self.cache.get(r)
+        if row is None:
+            row = self.cache[r] = self.row(r)
+        cells, bg, fg, bold = row
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return cells[index.column()]
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self._color(bg)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._color(fg) if fg else None
+        if role == Qt.ItemDataRole.FontRole:
+            if not bold:
+                return self.font
+            font = QFont(self.font) if self.font else QFont()
+            font.setBold(True)
+            return font
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def _color(self, name):
+        color = self.colors.get(name)
+        if color is None:
+            color = self.colors[name] = QColor(name)
+        return color
+
+    def refresh(self):
+        """Relê o engine: reseta a view se o número de linhas mudou."""
+        self.cache.clear()
+        rows = self.count()
+        if rows != self.rows:
+            self.beginResetModel()
+            self.rows = rows
+            self.endResetModel()
+        elif rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(rows - 1, len(self.HEADERS) - 1))
+
+
+class RSModel(EngineTableModel):
+    HEADERS = ("Nome", "Busy", "Op", "Operandos", "Ciclos")
+
+    def count(self):
+        return len(self.engine.rs)
+
+    def row(self, r):
+        rs = self.engine.rs[r]
+        if not rs.busy:
+            return (rs.name, "Não", "-", "-", "-"), COLOR_WHITE, None, False
+        vj_text = str(rs.vj) if rs.qj is None else f"ROB#{rs.qj}"
+        vk_text = str(rs.vk) if rs.qk is None else f"ROB#{rs.qk}"
+        cells = (rs.name, "Sim", rs.op or "-", f"{vj_text}, {vk_text}", str(rs.cycles))
+        return cells, COLOR_RS_BUSY, None, True
+
+
+class ROBModel(EngineTableModel):
+    HEADERS = ("#", "Busy", "Instrução", "Estado", "Value")
+
+    def count(self):
+        return len(self.engine.rob)
+
+    def row(self, r):
+        engine = self.engine
+        entry = engine.rob[r]
+
+        # Determine badge and color
+        badge = ""
+        if r == engine.rob_head:
+            badge = "[HEAD] "
+            bg_color = COLOR_ROB_HEAD
+        elif r == engine.rob_tail:
+            badge = "[TAIL] "
+            bg_color = COLOR_ROB_TAIL
+        elif entry.busy and entry.estado == 'ready':
+            bg_color = COLOR_ROB_READY
+        elif entry.busy:
+            bg_color = COLOR_ROB_EXECUTING
+        else:
+            bg_color = COLOR_WHITE
+
+        inst = entry.instruction
+        inst_text = f"{inst['op']} {inst['dest']} {inst['reg1']} {inst['reg2']}" if inst else "-"
+        cells = (
+            f"{badge}{r}",
+            "Sim" if entry.busy else "Não",
+            inst_text,
+            entry.estado.capitalize() if entry.busy else "-",
+            str(entry.value) if entry.value is not None else "-",
+        )
+        # Bold for HEAD/TAIL
+        return cells, bg_color, None, bool(badge)
+
+
+class RegisterModel(EngineTableModel):
+    HEADERS = ("Reg", "Valor")
+
+    def count(self):
+        return len(self.engine.registers)
+
+    def row(self, r):
+        val = self.engine.registers[r]
+        qi = self.engine.reg_status[r] if r < len(self.engine.reg_status) else None
+        if qi is not None:
+            # Bold for waiting registers
+            return (f"R{r}", f"{val} (ROB#{qi})"), COLOR_REG_WAITING_BG, COLOR_REG_WAITING_TEXT, True
+        return (f"R{r}", f"{val}"), COLOR_REG_NORMAL_BG, COLOR_REG_NORMAL_TEXT, False
+
+
+class ProgramModel(EngineTableModel):
+    """
+    Listagem do programa: destaca as instruções em voo (estado no ROB), o
+    próximo PC a emitir e as commitadas recentemente (as que ainda estão
+    no log de eventos). Programas .tbin só decodificam as linhas visíveis.
+    """
+
+    HEADERS = ("PC", "Instrução", "Estado")
+
+    def __init__(self, engine, font=None):
+        super().__init__(engine, font)
+        self.in_flight = None
+        self.committed = None
+
+    def count(self):
+        return len(self.engine.instructions)
+
+    def refresh(self):
+        self.in_flight = None
+        self.committed = None
+        super().refresh()
+
+    def row(self, r):
+        engine = self.engine
+        if self.in_flight is None:
+            # Calculados uma vez por pintura, só quando alguma linha aparece
+            self.in_flight = {entry.instruction.pc: (i, entry.estado)
+                              for i, entry in enumerate(engine.rob) if entry.busy}
+            self.committed = {ev.pc: ev.cycle for ev in engine.events.buffer if ev.kind == COMMIT}
+
+        text = str(engine.instructions[r])
+        if r in self.in_flight:
+            rob, estado = self.in_flight[r]
+            bg = COLOR_ROB_READY if estado == 'ready' else COLOR_ROB_EXECUTING
+            return (str(r), text, f"ROB#{rob} {estado.capitalize()}"), bg, None, True
+        if r == engine.pc:
+            return (str(r), text, "Próximo"), COLOR_PC_NEXT, None, True
+        if r in self.committed:
+            return (str(r), text, f"Commit (ciclo {self.committed[r]})"), COLOR_PC_COMMITTED, None, False
+        return (str(r), text, "-"), COLOR_WHITE, None, False
+
+    def focus_row(self):
+        """Linha a manter visível: a instrução no HEAD do ROB, ou o PC."""
+        head = self.engine.rob[self.engine.rob_head]
+        row = head.instruction.pc if head.busy else self.engine.pc
+        return min(row, self.rows - 1)
+
+
 class MainWindow(QMainWindow):
     """
     Simple PyQt6 GUI for Tomasulo simulator.
@@ -80,8 +301,14 @@ class MainWindow(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.engine = TomasuloEngine()
+        self.engine = TomasuloEngine(history_depth=HISTORY_DEPTH,
+                                     keyframe_interval=KEYFRAME_INTERVAL)
         self.current_program_path = None
+
+        # RUN sem bloquear a interface: o timer avanca o engine em pedacos
+        self.run_timer = QTimer(self)
+        self.run_timer.timeout.connect(self._run_tick)
+        self.last_refresh = 0.0
         
         # Extend registers to 32
         while len(self.engine.registers) < 32:
@@ -120,12 +347,20 @@ class MainWindow(QMainWindow):
         self.btn_load = QPushButton("CARREGAR PROGRAMA")
         self.btn_step = QPushButton("STEP ->")
         self.btn_run = QPushButton("RUN")
+        self.btn_stop = QPushButton("PARAR")
         self.btn_step_back = QPushButton("<- STEP BACK")
         self.btn_reset = QPushButton("RESETAR")
+
+        self.speed_combo = QComboBox()
+        for label, _ in RUN_SPEEDS:
+            self.speed_combo.addItem(label)
+        self.speed_combo.currentIndexChanged.connect(self._apply_speed)
+        self.btn_stop.setEnabled(False)
         
         self.btn_load.clicked.connect(self.load_program)
         self.btn_step.clicked.connect(self.step)
         self.btn_run.clicked.connect(self.run)
+        self.btn_stop.clicked.connect(self.stop)
         self.btn_step_back.clicked.connect(self.step_back)
         self.btn_reset.clicked.connect(self.reset)
         
@@ -193,6 +428,27 @@ class MainWindow(QMainWindow):
             }}
         """)
         
+        self.btn_stop.setStyleSheet(f"""
+            QPushButton {{
+                padding: 12px 24px;
+                font-size: 12px;
+                font-weight: 700;
+                border: none;
+                border-radius: 6px;
+                color: white;
+                background-color: {COLOR_BTN_RESET};
+            }}
+            QPushButton:hover {{
+                background-color: {COLOR_BTN_RESET_HOVER};
+            }}
+            QPushButton:pressed {{
+                background-color: {COLOR_BTN_RESET_PRESSED};
+            }}
+            QPushButton:disabled {{
+                background-color: {COLOR_BTN_DISABLED};
+            }}
+        """)
+        
         self.btn_step_back.setStyleSheet(f"""
             QPushButton {{
                 padding: 12px 24px;
@@ -238,6 +494,8 @@ class MainWindow(QMainWindow):
         btn_layout.addWidget(self.btn_load)
         btn_layout.addWidget(self.btn_step)
         btn_layout.addWidget(self.btn_run)
+        btn_layout.addWidget(self.btn_stop)
+        btn_layout.addWidget(self.speed_combo)
         btn_layout.addWidget(self.btn_step_back)
         btn_layout.addWidget(self.btn_reset)
         btn_layout.addStretch()
@@ -288,12 +546,14 @@ class MainWindow(QMainWindow):
         rs_label.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
         tables_layout.addWidget(rs_label)
         
-        self.rs_table = QTableWidget(5, 5)
-        self.rs_table.setHorizontalHeaderLabels(["Nome", "Busy", "Op", "Operandos", "Ciclos"])
+        # Tabelas virtualizadas: os modelos leem o engine e a view só pinta
+        # as linhas visíveis (qualquer número de RS, ROB e registradores)
+        self.rs_model = RSModel(self.engine)
+        self.rs_table = self._make_view(self.rs_model)
         self.rs_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.rs_table.setMaximumHeight(220)
         self.rs_table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {COLOR_WHITE};
                 border: 2px solid {COLOR_TABLE_BORDER};
                 border-radius: 8px;
@@ -307,7 +567,7 @@ class MainWindow(QMainWindow):
                 font-weight: bold;
                 font-size: 12px;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 6px;
             }}
         """)
@@ -319,12 +579,12 @@ class MainWindow(QMainWindow):
         rob_label.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
         tables_layout.addWidget(rob_label)
         
-        self.rob_table = QTableWidget(8, 5)
-        self.rob_table.setHorizontalHeaderLabels(["#", "Busy", "Instrução", "Estado", "Value"])
+        self.rob_model = ROBModel(self.engine)
+        self.rob_table = self._make_view(self.rob_model)
         self.rob_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.rob_table.setMaximumHeight(300)
         self.rob_table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {COLOR_WHITE};
                 border: 2px solid {COLOR_TABLE_BORDER};
                 border-radius: 8px;
@@ -338,7 +598,7 @@ class MainWindow(QMainWindow):
                 font-weight: bold;
                 font-size: 12px;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 6px;
             }}
         """)
@@ -350,10 +610,12 @@ class MainWindow(QMainWindow):
         console_label.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
         tables_layout.addWidget(console_label)
         
-        self.log_console = QTextEdit()
+        # Só as últimas LOG_LINES linhas ficam no console
+        self.log_console = QPlainTextEdit()
         self.log_console.setReadOnly(True)
+        self.log_console.setMaximumBlockCount(LOG_LINES)
         self.log_console.setStyleSheet(f"""
-            QTextEdit {{
+            QPlainTextEdit {{
                 font-family: 'Consolas', 'Courier New', monospace;
                 font-size: 11px;
                 font-weight: bold;
@@ -364,29 +626,65 @@ class MainWindow(QMainWindow):
                 padding: 10px;
             }}
         """)
-        self.log_console.setPlainText("Aguardando programa...\n")
+        self.log_console.setPlainText("Aguardando programa...")
+        # Último evento pintado no console (para acrescentar só os novos)
+        self.log_total = 0
+        self.log_last = None
         
         tables_layout.addWidget(self.log_console)
         
         content_layout.addLayout(tables_layout, 70)  # 70% width
         
-        # Right side: Registers
+        # Right side: Program listing and registers
         registers_layout = QVBoxLayout()
         registers_layout.setSpacing(10)
+        mono_font = QFont("Consolas", 10, QFont.Weight.Medium)
+
+        program_label = QLabel("Programa")
+        program_label.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
+        registers_layout.addWidget(program_label)
+
+        self.program_model = ProgramModel(self.engine, mono_font)
+        self.program_view = self._make_view(self.program_model)
+        self.program_view.verticalHeader().setVisible(False)
+        self.program_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
+        self.program_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.program_view.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.program_view.setColumnWidth(0, 60)
+        self.program_view.setStyleSheet(f"""
+            QTableView {{
+                background-color: {COLOR_WHITE};
+                border: 2px solid {COLOR_TABLE_BORDER};
+                border-radius: 8px;
+                gridline-color: {COLOR_TABLE_GRIDLINE};
+            }}
+            QHeaderView::section {{
+                background-color: {COLOR_TABLE_HEADER};
+                color: white;
+                padding: 8px;
+                border: none;
+                font-weight: bold;
+                font-size: 12px;
+            }}
+            QTableView::item {{
+                padding: 6px;
+            }}
+        """)
+        registers_layout.addWidget(self.program_view)
         
-        reg_label = QLabel("Registradores (R0-R31)")
+        reg_label = QLabel("Registradores")
         reg_label.setStyleSheet(f"font-size: 15px; font-weight: bold; color: {COLOR_TEXT_PRIMARY};")
         registers_layout.addWidget(reg_label)
         
         # Create register table
-        self.reg_table = QTableWidget(32, 2)
-        self.reg_table.setHorizontalHeaderLabels(["Reg", "Valor"])
+        self.reg_model = RegisterModel(self.engine, mono_font)
+        self.reg_table = self._make_view(self.reg_model)
         self.reg_table.verticalHeader().setVisible(False)
         self.reg_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         self.reg_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.reg_table.setColumnWidth(0, 60)
         self.reg_table.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {COLOR_WHITE};
                 border: 2px solid {COLOR_TABLE_BORDER};
                 border-radius: 8px;
@@ -400,26 +698,11 @@ class MainWindow(QMainWindow):
                 font-weight: bold;
                 font-size: 12px;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 6px;
             }}
         """)
         
-        # Initialize register cells
-        mono_font = QFont("Consolas", 10, QFont.Weight.Medium)
-        for i in range(32):
-            # Register name
-            name_item = QTableWidgetItem(f"R{i}")
-            name_item.setFont(mono_font)
-            name_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.reg_table.setItem(i, 0, name_item)
-            
-            # Register value
-            value_item = QTableWidgetItem("0")
-            value_item.setFont(mono_font)
-            value_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.reg_table.setItem(i, 1, value_item)
-        
         registers_layout.addWidget(self.reg_table)
         
         content_layout.addLayout(registers_layout, 30)  # 30% width
@@ -435,18 +718,15 @@ class MainWindow(QMainWindow):
             self,
             "Carregar Programa MIPS",
             "examples",
-            "Assembly Files (*.asm);;All Files (*)"
+            "Assembly Files (*.asm);;Programas Compilados (*.tbin);;All Files (*)"
         )
         
         if not file_path:
             return
         
         try:
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-            
-            program = [parse_mips(line) for line in lines]
-            program = [inst for inst in program if inst is not None]
+            # Streaming + cache por caminho/mtime
+            program = load_asm(file_path)
             
             if not program:
                 self.statusBar().showMessage("Nenhuma instrução válida encontrada!", 3000)
@@ -458,6 +738,8 @@ class MainWindow(QMainWindow):
             
             self.statusBar().showMessage(f"Programa carregado: {len(program)} instruções", 3000)
         
+        except AsmError as e:
+            self.statusBar().showMessage(f"Erro na linha {e.lineno}: {e.message}", 5000)
         except Exception as e:
             self.statusBar().showMessage(f"Erro ao carregar: {str(e)}", 5000)
     
@@ -476,7 +758,7 @@ class MainWindow(QMainWindow):
 
     def step_back(self):
         """Volta um ciclo na simulação."""
-        if not self.engine.history:
+        if not self.engine.can_step_back():
             self.statusBar().showMessage("Não há estado anterior para voltar!", 3000)
             return
 
@@ -488,7 +770,11 @@ class MainWindow(QMainWindow):
             self.statusBar().showMessage(f"Erro no step_back: {str(e)}", 3000)
     
     def run(self):
-        """Execute until completion with delay for visualization."""
+        """Executa até o fim (sem limite de ciclos); com o RUN ativo, pausa."""
+        if self.run_timer.isActive():
+            self._stop_run("Pausado", "CONTINUAR")
+            return
+
         if not self.engine.instructions:
             self.statusBar().showMessage("Nenhum programa carregado!", 3000)
             return
@@ -496,37 +782,64 @@ class MainWindow(QMainWindow):
         if self.engine.is_complete():
             self.statusBar().showMessage("Simulação já completa!", 3000)
             return
-        
-        max_cycles = 100
-        cycles = 0
-        
-        while not self.engine.is_complete() and cycles < max_cycles:
-            self.engine.step()
-            self.update_ui()
-            
-            # Small delay for visualization
-            time.sleep(0.3)
-            
-            # Process events to keep UI responsive
-            from PyQt6.QtWidgets import QApplication
-            QApplication.processEvents()
-            
-            cycles += 1
-        
-        if cycles >= max_cycles:
-            self.statusBar().showMessage("Limite de ciclos atingido!", 3000)
+
+        self.btn_run.setText("PAUSAR")
+        self.btn_stop.setEnabled(True)
+        for btn in (self.btn_load, self.btn_step, self.btn_step_back):
+            btn.setEnabled(False)
+        self.statusBar().showMessage("Executando...")
+        self._apply_speed()
+        self.run_timer.start()
+
+    def stop(self):
+        """Interrompe o RUN; o próximo RUN começa do ciclo atual."""
+        if self.run_timer.isActive() or self.btn_run.text() != "RUN":
+            self._stop_run("Execução interrompida", "RUN")
+
+    def _stop_run(self, message, run_label):
+        self.run_timer.stop()
+        self.btn_run.setText(run_label)
+        self.btn_stop.setEnabled(run_label != "RUN")
+        for btn in (self.btn_load, self.btn_step, self.btn_step_back):
+            btn.setEnabled(True)
+        self.update_ui()
+        self.statusBar().showMessage(message, 3000)
+
+    def _apply_speed(self):
+        """Ajusta o intervalo do timer à velocidade escolhida."""
+        _, seconds = RUN_SPEEDS[self.speed_combo.currentIndex()]
+        self.run_timer.setInterval(int(seconds * 1000))
+
+    def _run_tick(self):
+        """Avança o engine um ciclo (ou um pedaço de ciclos na velocidade máxima)."""
+        _, seconds = RUN_SPEEDS[self.speed_combo.currentIndex()]
+        engine = self.engine
+        if seconds:
+            engine.step()
         else:
-            self.statusBar().showMessage("Simulação completa!", 3000)
+            deadline = time.perf_counter() + RUN_CHUNK_SECONDS
+            while not engine.is_complete() and time.perf_counter() < deadline:
+                engine.step()
+
+        if engine.is_complete():
+            self._stop_run("Simulação completa!", "RUN")
+            return
+
+        now = time.perf_counter()
+        if now - self.last_refresh >= REFRESH_SECONDS:
+            self.last_refresh = now
+            self.update_ui()
     
     def reset(self):
         """Reset simulation with current program."""
+        self.stop()
         if self.current_program_path:
-            # Reload same program
-            with open(self.current_program_path, 'r') as f:
-                lines = f.readlines()
-            
-            program = [parse_mips(line) for line in lines]
-            program = [inst for inst in program if inst is not None]
+            # Reload same program (served from the loader cache unless the file changed)
+            try:
+                program = load_asm(self.current_program_path)
+            except (AsmError, OSError) as e:
+                self.statusBar().showMessage(f"Erro ao recarregar: {str(e)}", 5000)
+                return
             
             self.engine.load_program(program)
             self.update_ui()
@@ -542,141 +855,65 @@ class MainWindow(QMainWindow):
         self.lbl_cycle.setText(f"Ciclo: {metrics['cycles']}")
         self.lbl_ipc.setText(f"IPC: {metrics['ipc']:.2f}")
         self.lbl_bubbles.setText(f"Bolhas: {metrics['bubbles']}")
+        # Motivos das bolhas e pilha de CPI ao passar o mouse
+        stalls = [f"{name[len('stall_'):]}: {value}" for name, value in metrics.items()
+                  if name.startswith('stall_')]
+        stack = [f"{name}: {cpi:.2f}" for name, cpi in metrics['cpi_stack'].items() if cpi]
+        self.lbl_bubbles.setToolTip("\n".join(stalls + ["", "CPI:"] + stack))
         self.lbl_flushes.setText(f"Flushes: {metrics['flushes']}")
         
-        # === UPDATE RS TABLE ===
-        for i, rs in enumerate(self.engine.rs):
-            # Name
-            self.rs_table.setItem(i, 0, QTableWidgetItem(rs['name']))
-            
-            # Busy
-            busy_text = "Sim" if rs['busy'] else "Não"
-            self.rs_table.setItem(i, 1, QTableWidgetItem(busy_text))
-            
-            # Op
-            op_text = rs['op'] if rs['op'] else "-"
-            self.rs_table.setItem(i, 2, QTableWidgetItem(op_text))
-            
-            # Operands
-            if rs['busy']:
-                vj_text = str(rs['vj']) if rs['qj'] is None else f"ROB#{rs['qj']}"
-                vk_text = str(rs['vk']) if rs['qk'] is None else f"ROB#{rs['qk']}"
-                operands = f"{vj_text}, {vk_text}"
-            else:
-                operands = "-"
-            self.rs_table.setItem(i, 3, QTableWidgetItem(operands))
-            
-            # Cycles
-            cycles_text = str(rs['cycles']) if rs['busy'] else "-"
-            self.rs_table.setItem(i, 4, QTableWidgetItem(cycles_text))
-            
-            # Color: Yellow if busy
-            bg_color = QColor(COLOR_RS_BUSY) if rs['busy'] else QColor(COLOR_WHITE)
-            for col in range(5):
-                self.rs_table.item(i, col).setBackground(bg_color)
-                self.rs_table.item(i, col).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                if rs['busy']:
-                    font = self.rs_table.item(i, col).font()
-                    font.setBold(True)
-                    self.rs_table.item(i, col).setFont(font)
-        
-        # === UPDATE ROB TABLE ===
-        for i in range(8):
-            entry = self.engine.rob[i]
-            
-            # Determine badge and color
-            badge = ""
-            if i == self.engine.rob_head:
-                badge = "[HEAD] "
-                bg_color = QColor(COLOR_ROB_HEAD)
-            elif i == self.engine.rob_tail:
-                badge = "[TAIL] "
-                bg_color = QColor(COLOR_ROB_TAIL)
-            elif entry['busy'] and entry['estado'] == 'ready':
-                bg_color = QColor(COLOR_ROB_READY)
-            elif entry['busy']:
-                bg_color = QColor(COLOR_ROB_EXECUTING)
-            else:
-                bg_color = QColor(COLOR_WHITE)
-            
-            # # Column
-            self.rob_table.setItem(i, 0, QTableWidgetItem(f"{badge}{i}"))
-            
-            # Busy
-            busy_text = "Sim" if entry['busy'] else "Não"
-            self.rob_table.setItem(i, 1, QTableWidgetItem(busy_text))
-            
-            # Instruction
-            if entry['instruction']:
-                inst = entry['instruction']
-                inst_text = f"{inst['op']} {inst['dest']} {inst['reg1']} {inst['reg2']}"
-            else:
-                inst_text = "-"
-            self.rob_table.setItem(i, 2, QTableWidgetItem(inst_text))
-            
-            # State
-            state_text = entry['estado'].capitalize() if entry['busy'] else "-"
-            self.rob_table.setItem(i, 3, QTableWidgetItem(state_text))
-            
-            # Value
-            value_text = str(entry['value']) if entry['value'] is not None else "-"
-            self.rob_table.setItem(i, 4, QTableWidgetItem(value_text))
-            
-            # Apply background color to all columns
-            for col in range(5):
-                self.rob_table.item(i, col).setBackground(bg_color)
-                self.rob_table.item(i, col).setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                if badge:  # Bold for HEAD/TAIL
-                    font = self.rob_table.item(i, col).font()
-                    font.setBold(True)
-                    self.rob_table.item(i, col).setFont(font)
-        
-        # === UPDATE REGISTERS TABLE ===
-        for i in range(32):
-            val = self.engine.registers[i] if i < len(self.engine.registers) else 0
-            qi = self.engine.reg_status[i] if i < len(self.engine.reg_status) else None
-            
-            # Update register name (column 0)
-            name_item = self.reg_table.item(i, 0)
-            name_item.setText(f"R{i}")
-            
-            # Update register value (column 1)
-            value_item = self.reg_table.item(i, 1)
-            if qi is not None:
-                value_item.setText(f"{val} (ROB#{qi})")
-                name_item.setBackground(QColor(COLOR_REG_WAITING_BG))
-                name_item.setForeground(QColor(COLOR_REG_WAITING_TEXT))
-                value_item.setBackground(QColor(COLOR_REG_WAITING_BG))
-                value_item.setForeground(QColor(COLOR_REG_WAITING_TEXT))
-                
-                # Bold font for waiting registers
-                font = value_item.font()
-                font.setBold(True)
-                value_item.setFont(font)
-                name_item.setFont(font)
-            else:
-                value_item.setText(f"{val}")
-                name_item.setBackground(QColor(COLOR_REG_NORMAL_BG))
-                name_item.setForeground(QColor(COLOR_REG_NORMAL_TEXT))
-                value_item.setBackground(QColor(COLOR_REG_NORMAL_BG))
-                value_item.setForeground(QColor(COLOR_REG_NORMAL_TEXT))
-                
-                # Normal font
-                font = value_item.font()
-                font.setBold(False)
-                value_item.setFont(font)
-                name_item.setFont(font)
+        # === UPDATE TABLES (só as linhas visíveis são repintadas) ===
+        for model in (self.rs_model, self.rob_model, self.reg_model, self.program_model):
+            model.refresh()
+        if self.program_model.rows:
+            # Acompanha a execução na listagem do programa
+            self.program_view.scrollTo(self.program_model.index(self.program_model.focus_row(), 0),
+                                       QAbstractItemView.ScrollHint.EnsureVisible)
         
         # === UPDATE LOG CONSOLE ===
-        if self.engine.log_messages:
-            # Show last 20 messages
-            recent_logs = self.engine.log_messages[-20:]
-            log_text = "\n".join([f"[Ciclo {self.engine.cycle}] {msg}" for msg in recent_logs])
-            self.log_console.setPlainText(log_text)
-            # Auto-scroll to bottom
-            self.log_console.verticalScrollBar().setValue(
-                self.log_console.verticalScrollBar().maximum()
-            )
+        self._update_log()
 
         # === ENABLE/DISABLE STEP BACK ===
-        self.btn_step_back.setEnabled(len(self.engine.history) > 0)
\ No newline at end of file
+        if not self.run_timer.isActive():
+            self.btn_step_back.setEnabled(self.engine.can_step_back())
+
+    def _make_view(self, model):
+        """QTableView ligada ao modelo, com linhas de altura fixa (rolagem
+        sem medir o conteúdo de cada linha)."""
+        view = QTableView()
+        view.setModel(model)
+        view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        return view
+
+    def _update_log(self):
+        """Acrescenta ao console só os eventos novos (últimos LOG_LINES).
+
+        Se o log foi truncado (step back) ou andou mais que LOG_LINES desde a
+        última pintura, o console é refeito a partir de events.recent().
+        """
+        events = self.engine.events
+        new = events.total - self.log_total
+        last = self.log_last
+        if new == 0 and (not events.buffer or events.buffer[-1] is last):
+            return
+
+        buffer = events.buffer
+        appendable = (last is not None and 0 < new <= LOG_LINES and new < len(buffer)
+                      and buffer[-new - 1] is last)
+        if appendable:
+            for ev in events.recent(new):
+                self.log_console.appendPlainText(f"[Ciclo {ev.cycle}] {render_event(ev)}")
+        else:
+            # Texto montado só aqui, para os eventos visíveis
+            recent_events = events.recent(LOG_LINES)
+            self.log_console.setPlainText(
+                "\n".join(f"[Ciclo {ev.cycle}] {render_event(ev)}" for ev in recent_events)
+                if recent_events else "Aguardando programa...")
+        self.log_total = events.total
+        self.log_last = buffer[-1] if buffer else None
+
+        # Auto-scroll to bottom
+        self.log_console.verticalScrollBar().setValue(
+            self.log_console.verticalScrollBar().maximum()
+        )
\ No newline at end of file
@@ -3,8 +3,6 @@ Simulador do algoritmo de Tomasulo
 Projeto acadêmico para a disciplina de Arquitetura de Computadores
 """
 
-from PyQt6.QtWidgets import QApplication
-from gui.main_window import MainWindow
 import subprocess
 import sys
 
@@ -13,6 +11,17 @@ import sys
 # ------------
 def main():
     """Iniciar a interface gráfica do simulador Tomasulo."""
+    # Modo em lote: `python main.py batch|sweep ...` roda sem importar o PyQt6
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        from simulator.batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        from simulator.sweep import main as sweep_main
+        sys.exit(sweep_main(sys.argv[2:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from gui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     
     # Definir metadados da aplicação
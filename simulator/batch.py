@@ -0,0 +1,164 @@
+"""
+    Executor em lote (sem interface grafica) do simulador de Tomasulo
+
+    Carrega um ou varios arquivos .asm/.tbin (ou diretorios com eles), executa
+    cada programa ate is_complete() e grava as metricas de get_metrics()
+    junto com os registradores finais em JSON, JSON Lines ou CSV.
+
+    Nao importa PyQt6, entao pode rodar em servidores sem display.
+
+    Use:
+        python -m simulator.batch examples/
+        python -m simulator.batch examples/*.asm --format csv -o resultados.csv
+        python main.py batch examples/ --format jsonl
+        python -m simulator.batch examples/ --config maquina_larga.toml
+        python -m simulator.batch examples/ --recovery commit resolve -f csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from dataclasses import replace
+
+from .config import RECOVERY_POLICIES, MachineConfig
+from .loader import AsmError, load_program
+from .tomasulo_engine import TomasuloEngine
+
+# Limite padrao de ciclos por programa (evita laco infinito em programas travados)
+MAX_CYCLES = 1_000_000
+
+FORMATS = ('json', 'jsonl', 'csv')
+
+# Extensoes reconhecidas ao percorrer diretorios
+PROGRAM_EXTENSIONS = ('.asm', '.tbin')
+
+
+def collect_programs(paths):
+    """Expande arquivos e diretorios na lista ordenada de programas (.asm/.tbin)."""
+    programs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith(PROGRAM_EXTENSIONS):
+                        programs.append(os.path.join(root, name))
+        else:
+            programs.append(path)
+    return sorted(programs)
+
+
+def run_program(path, max_cycles=MAX_CYCLES, config=None):
+    """Simula um programa ate o fim (ou ate max_cycles) e retorna o resultado.
+
+    Programas com erro de montagem geram um resultado com 'error' preenchido
+    (e metricas zeradas) em vez de interromper o lote.
+    """
+    # Sem historico nem log (e pulando ciclos ociosos): so interessam as metricas finais
+    engine = TomasuloEngine(config, record_history=False, log_events=False,
+                            event_driven=True)
+    program = None
+    try:
+        program = load_program(path, cache=False)
+        engine.load_program(program)
+    except (AsmError, ValueError, OSError) as e:
+        _close(program)
+        engine.reset()
+        result = {'program': path, 'complete': False, 'error': str(e),
+                  'recovery': engine.config.recovery}
+        result.update(engine.get_metrics())
+        result['registers'] = list(engine.registers)
+        return result
+
+    try:
+        metrics = engine.run_until_complete(max_cycles)
+    finally:
+        _close(program)
+
+    result = {'program': path, 'complete': engine.is_complete(), 'error': None,
+              'recovery': engine.config.recovery}
+    result.update(metrics)
+    result['registers'] = list(engine.registers)
+    return result
+
+
+def _close(program):
+    # Programas .tbin mantem o arquivo mapeado aberto
+    close = getattr(program, 'close', None)
+    if close is not None:
+        close()
+
+
+def _csv_row(result):
+    # Metricas compostas (ex.: histograma de latencia) viram JSON na celula
+    row = {k: json.dumps(v) if isinstance(v, dict) else v
+           for k, v in result.items() if k != 'registers'}
+    for i, value in enumerate(result.get('registers', ())):
+        row[f"R{i}"] = value
+    return row
+
+
+def write_results(results, out, fmt):
+    """Grava os resultados (iteravel) no arquivo aberto, no formato pedido."""
+    if fmt == 'jsonl':
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+    elif fmt == 'csv':
+        writer = None
+        for result in results:
+            row = _csv_row(result)
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+    else:
+        json.dump(list(results), out, indent=2)
+        out.write("\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator.batch",
+        description="Executa programas .asm/.tbin no simulador de Tomasulo sem interface grafica."
+    )
+    parser.add_argument('paths', nargs='+', help="arquivos .asm/.tbin ou diretorios")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='json',
+                        help="formato de saida (padrao: json)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="arquivo de saida (padrao: stdout)")
+    parser.add_argument('--max-cycles', type=int, default=MAX_CYCLES,
+                        help=f"limite de ciclos por programa (padrao: {MAX_CYCLES})")
+    parser.add_argument('-c', '--config',
+                        help="configuracao da maquina (.json ou .toml)")
+    parser.add_argument('--recovery', nargs='+', choices=RECOVERY_POLICIES,
+                        help="politica(s) de recuperacao de desvios; com varias, "
+                             "cada programa roda uma vez por politica")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    programs = collect_programs(args.paths)
+    if not programs:
+        print("Nenhum programa .asm/.tbin encontrado!", file=sys.stderr)
+        return 1
+
+    config = MachineConfig.load(args.config) if args.config else MachineConfig()
+    configs = [replace(config, recovery=policy) for policy in args.recovery or [config.recovery]]
+
+    # Gerador: os resultados sao gravados conforme cada programa termina
+    results = (run_program(path, args.max_cycles, cfg)
+               for path in programs for cfg in configs)
+
+    if args.output == '-':
+        write_results(results, sys.stdout, args.format)
+    else:
+        with open(args.output, 'w', newline='') as out:
+            write_results(results, out, args.format)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
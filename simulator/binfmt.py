@@ -0,0 +1,216 @@
+"""
+    Formato binario de programa compilado (.tbin)
+
+    Para traces sinteticos enormes, montar o texto domina a inicializacao.
+    O .tbin guarda o programa ja decodificado em registros de tamanho fixo,
+    e o MappedProgram le o arquivo via mmap: abrir um programa de 10M de
+    instrucoes nao decodifica nada, cada instrucao e desempacotada so quando
+    o engine a busca.
+
+    Layout (little-endian):
+        cabecalho: magic 'TOMB', versao u16, maior registrador u16, quantidade u64
+        registro:  op u8, dest u8, src1 u8, src2 u8, offset i32   (8 bytes)
+
+    Use:
+        python -m simulator.binfmt programa.asm -o programa.tbin
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+from .program import BRANCH_OPS, DecodedInstruction
+
+MAGIC = b'TOMB'
+# v2: SW guarda o registrador de dado em src2
+VERSION = 2
+EXTENSION = '.tbin'
+
+HEADER = struct.Struct('<4sHHQ')
+RECORD = struct.Struct('<BBBBi')
+
+# Maior indice de registrador que cabe num registro
+MAX_REGISTER = 255
+# Instrucoes decodificadas mantidas em memoria pelo MappedProgram
+DECODE_CACHE_SIZE = 65536
+
+
+class BinaryFormatError(ValueError):
+    """Arquivo .tbin invalido ou instrucao que nao cabe no formato."""
+
+
+def write_program(instructions, path):
+    """Grava instrucoes decodificadas (iteravel) em `path`; retorna a quantidade.
+
+    Grava num arquivo temporario no mesmo diretorio e o troca pelo destino
+    com os.replace: um MappedProgram ainda aberto no arquivo antigo continua
+    vendo o conteudo antigo (reescrever em lugar trocaria os bytes sob o
+    mmap, ou causaria SIGBUS se o arquivo encolhesse). Em caso de erro o
+    temporario e removido e o destino fica intacto.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'xb') as f:
+            count = _write_records(instructions, f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return count
+
+
+def _write_records(instructions, f):
+    count = 0
+    highest = 0
+    f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+    pack = RECORD.pack
+    for inst in instructions:
+        reg = max(inst.dest, inst.src1, inst.src2)
+        if reg > MAX_REGISTER:
+            raise BinaryFormatError(f"PC={count}: R{reg} nao cabe no formato (max R{MAX_REGISTER})")
+        highest = max(highest, reg)
+        try:
+            f.write(pack(inst.op, inst.dest, inst.src1, inst.src2, inst.offset))
+        except struct.error:
+            raise BinaryFormatError(f"PC={count}: offset {inst.offset} fora do intervalo de 32 bits") from None
+        count += 1
+    # Cabecalho definitivo, agora que a quantidade e conhecida
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, highest, count))
+    return count
+
+
+# Registro usado no digest de instrucoes que nao cabem no RECORD
+WIDE_RECORD = struct.Struct('<Bqqqq')
+
+
+def program_digest(instructions):
+    """SHA-256 (hex) do programa decodificado.
+
+    Usa a mesma codificacao dos registros do .tbin, entao um .asm e o .tbin
+    compilado dele tem o mesmo digest; um MappedProgram nem decodifica.
+    """
+    digest = getattr(instructions, 'digest', None)
+    if digest is not None:
+        return digest()
+    h = hashlib.sha256()
+    pack = RECORD.pack
+    for inst in instructions:
+        fields = (inst.op, inst.dest, inst.src1, inst.src2, inst.offset)
+        try:
+            h.update(pack(*fields))
+        except struct.error:
+            # Nao existe em .tbin: qualquer codificacao sem ambiguidade serve
+            h.update(b'W' + WIDE_RECORD.pack(*fields))
+    return h.hexdigest()
+
+
+def compile_asm(src, dst):
+    """Compila um .asm em .tbin em streaming; retorna a quantidade de instrucoes."""
+    from .loader import iter_asm
+    return write_program((inst for _, inst in iter_asm(src)), dst)
+
+
+class MappedProgram:
+    """Programa .tbin mapeado em memoria, com interface de sequencia.
+
+    program[pc] devolve um DecodedInstruction desempacotado sob demanda (com
+    um cache limitado, ja que lacos re-buscam as mesmas instrucoes).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BinaryFormatError(f"{path}: arquivo vazio") from None
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise BinaryFormatError(f"{path}: cabecalho truncado")
+        magic, version, max_reg, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise BinaryFormatError(f"{path}: nao e um programa .tbin v{VERSION}")
+        if len(self._map) < HEADER.size + count * RECORD.size:
+            self.close()
+            raise BinaryFormatError(f"{path}: {count} instrucoes declaradas, arquivo truncado")
+
+        self.max_reg = max_reg
+        self._count = count
+        self._cache = {}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, pc):
+        inst = self._cache.get(pc)
+        if inst is not None:
+            return inst
+        if pc < 0:
+            pc += self._count
+        if not 0 <= pc < self._count:
+            raise IndexError(pc)
+
+        op, dest, src1, src2, offset = RECORD.unpack_from(self._map, HEADER.size + pc * RECORD.size)
+        target = pc + 1 + offset if op in BRANCH_OPS else None
+        inst = DecodedInstruction(pc, op, dest, src1, src2, offset, target)
+
+        if len(self._cache) >= DECODE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[pc] = inst
+        return inst
+
+    def __iter__(self):
+        for pc in range(self._count):
+            yield self[pc]
+
+    def digest(self):
+        """SHA-256 (hex) dos registros mapeados (ver program_digest)."""
+        start = HEADER.size
+        return hashlib.sha256(self._map[start:start + self._count * RECORD.size]).hexdigest()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_binary(path):
+    return MappedProgram(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator.binfmt",
+        description="Compila programas .asm para o formato binario .tbin."
+    )
+    parser.add_argument('source', help="arquivo .asm")
+    parser.add_argument('-o', '--output', help="arquivo .tbin (padrao: mesmo nome com .tbin)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.source)[0] + EXTENSION
+    try:
+        count = compile_asm(args.source, output)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    print(f"{count} instrucoes -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
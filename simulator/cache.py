@@ -0,0 +1,263 @@
+"""
+    Modelo de hierarquia de caches de dados (L1/L2/...)
+
+    Cada nivel e uma cache associativa por conjunto com tags fatiadas por
+    bits (offset | indice | tag) e estado em listas planas (um slot por
+    via), entao a busca de uma tag e um list.index() sobre as vias do
+    conjunto. Substituicao LRU (carimbos de tempo) ou PLRU em arvore (um
+    inteiro de bits por conjunto).
+
+    A MemoryHierarchy devolve a latencia de cada acesso: soma das latencias
+    dos niveis consultados, mais a da memoria principal se todos falharem.
+    Com MSHRs no primeiro nivel, faltas para uma linha que ja esta sendo
+    buscada esperam a mesma busca, e com todos os MSHRs ocupados a falta
+    espera o primeiro liberar.
+
+    Todo o estado mutavel fica em listas escritas por `write` (o _set do
+    engine), entao o journal desfaz acessos no step_back.
+"""
+
+from dataclasses import asdict, dataclass
+
+from .history import TrackedState, untracked
+
+POLICIES = ('lru', 'plru')
+
+# Baldes do histograma de latencia de faltas: potencias de 2
+HISTOGRAM_BUCKETS = 32
+
+# Via vazia / MSHR livre (None: qualquer inteiro, ate negativo, e uma tag valida)
+INVALID = None
+
+
+@dataclass
+class CacheLevel:
+    """Geometria e temporizacao de um nivel de cache."""
+
+    name: str = 'L1'
+    size: int = 32 * 1024
+    assoc: int = 8
+    line_size: int = 64
+    latency: int = 1
+    policy: str = 'lru'
+    # Faltas simultaneas em andamento (0 = sem limite nem fusao de faltas)
+    mshrs: int = 0
+
+    def __post_init__(self):
+        self.validate()
+
+    def validate(self):
+        for name in ('size', 'assoc', 'line_size', 'latency'):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{self.name}: {name} deve ser >= 1")
+        if self.mshrs < 0:
+            raise ValueError(f"{self.name}: mshrs deve ser >= 0")
+        if self.policy not in POLICIES:
+            raise ValueError(f"{self.name}: politica {self.policy!r} invalida (use {', '.join(POLICIES)})")
+        if self.size % (self.assoc * self.line_size):
+            raise ValueError(f"{self.name}: size deve ser multiplo de assoc * line_size")
+        sets = self.size // (self.assoc * self.line_size)
+        for name, value in (('line_size', self.line_size), ('numero de conjuntos', sets)):
+            if value & (value - 1):
+                raise ValueError(f"{self.name}: {name} deve ser potencia de 2")
+        if self.policy == 'plru' and self.assoc & (self.assoc - 1):
+            raise ValueError(f"{self.name}: PLRU exige associatividade potencia de 2")
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class Cache(TrackedState):
+    """Uma cache associativa por conjunto (so tags, sem dados)."""
+
+    def __init__(self, level, write=untracked):
+        self.level = level
+        self.name = level.name
+        self.latency = level.latency
+        self.assoc = level.assoc
+        self.write = write
+
+        sets = level.size // (level.assoc * level.line_size)
+        self.offset_bits = level.line_size.bit_length() - 1
+        self.index_bits = sets.bit_length() - 1
+        self.index_mask = sets - 1
+        self.plru = level.policy == 'plru'
+        self.tree_levels = level.assoc.bit_length() - 1
+
+        # tags[set * assoc + via]; INVALID = via vazia
+        self.tags = [INVALID] * (sets * level.assoc)
+        # LRU: carimbo do ultimo acesso por via; PLRU: bits da arvore por conjunto
+        self.stamps = [0] * (sets * level.assoc)
+        self.tree = [0] * sets
+        # acessos, acertos, faltas, relogio do LRU
+        self.counters = [0, 0, 0, 0]
+
+    def line_of(self, address):
+        return address >> self.offset_bits
+
+    def access(self, line):
+        """Consulta (e preenche, se faltar) a linha; retorna True se acertou."""
+        write = self.write
+        counters = self.counters
+        write(counters, 0, counters[0] + 1)
+
+        index = line & self.index_mask
+        tag = line >> self.index_bits
+        base = index * self.assoc
+        try:
+            way = self.tags.index(tag, base, base + self.assoc) - base
+            hit = True
+            write(counters, 1, counters[1] + 1)
+        except ValueError:
+            way = self._victim(index, base)
+            hit = False
+            write(counters, 2, counters[2] + 1)
+            write(self.tags, base + way, tag)
+
+        self._touch(index, base, way)
+        return hit
+
+    def _victim(self, index, base):
+        tags = self.tags
+        try:
+            return tags.index(INVALID, base, base + self.assoc) - base
+        except ValueError:
+            pass
+        if self.plru:
+            bits = self.tree[index]
+            node, way = 1, 0
+            for _ in range(self.tree_levels):
+                b = (bits >> node) & 1
+                way = way * 2 + b
+                node = node * 2 + b
+            return way
+        stamps = self.stamps
+        oldest = min(range(base, base + self.assoc), key=stamps.__getitem__)
+        return oldest - base
+
+    def _touch(self, index, base, way):
+        if self.plru:
+            # Cada no da arvore passa a apontar para longe da via acessada
+            bits = self.tree[index]
+            node = 1
+            for level in range(self.tree_levels - 1, -1, -1):
+                b = (way >> level) & 1
+                if b:
+                    bits &= ~(1 << node)
+                else:
+                    bits |= 1 << node
+                node = node * 2 + b
+            self.write(self.tree, index, bits)
+        else:
+            counters = self.counters
+            clock = counters[3] + 1
+            self.write(counters, 3, clock)
+            self.write(self.stamps, base + way, clock)
+
+    @property
+    def accesses(self):
+        return self.counters[0]
+
+    @property
+    def hits(self):
+        return self.counters[1]
+
+    @property
+    def misses(self):
+        return self.counters[2]
+
+    def state(self):
+        return [self.tags, self.stamps, self.tree, self.counters]
+
+
+class MemoryHierarchy(TrackedState):
+    """Niveis de cache em serie na frente da memoria principal."""
+
+    def __init__(self, levels, memory_latency=100, write=untracked):
+        if not levels:
+            raise ValueError("A hierarquia precisa de pelo menos um nivel")
+        if memory_latency < 1:
+            raise ValueError("memory_latency deve ser >= 1")
+        self.caches = [Cache(level, write) for level in levels]
+        self.memory_latency = memory_latency
+        self.write = write
+
+        # MSHRs do primeiro nivel: linha em busca e ciclo em que ela chega
+        mshrs = levels[0].mshrs
+        self.mshr_line = [INVALID] * mshrs
+        self.mshr_ready = [0] * mshrs
+        # Faltas no primeiro nivel por balde de latencia (balde b: [2^(b-1), 2^b))
+        self.miss_histogram = [0] * HISTOGRAM_BUCKETS
+
+    def _walk(self, address):
+        """Consulta os niveis em ordem; retorna (latencia, acertou no primeiro)."""
+        latency = 0
+        for depth, cache in enumerate(self.caches):
+            latency += cache.latency
+            if cache.access(cache.line_of(address)):
+                return latency, depth == 0
+        return latency + self.memory_latency, False
+
+    def load(self, address, cycle):
+        """Latencia de um LW que acessa a hierarquia no ciclo `cycle`."""
+        first = self.caches[0]
+        line = first.line_of(address)
+
+        if self.mshr_line:
+            # Linha ja em busca: espera a mesma falta (falta secundaria)
+            for k, pending in enumerate(self.mshr_line):
+                if pending == line and self.mshr_ready[k] > cycle:
+                    counters = first.counters
+                    self.write(counters, 0, counters[0] + 1)
+                    self.write(counters, 2, counters[2] + 1)
+                    latency = self.mshr_ready[k] - cycle
+                    self._record_miss(latency)
+                    return latency
+
+        latency, hit = self._walk(address)
+        if hit:
+            return latency
+
+        if self.mshr_line:
+            # Usa um MSHR livre, ou espera o que libera primeiro
+            k = min(range(len(self.mshr_ready)), key=self.mshr_ready.__getitem__)
+            latency += max(0, self.mshr_ready[k] - cycle)
+            self.write(self.mshr_line, k, line)
+            self.write(self.mshr_ready, k, cycle + latency)
+
+        self._record_miss(latency)
+        return latency
+
+    def store(self, address):
+        """SW no commit: atualiza as caches (write-allocate); a latencia fica
+        escondida pelo buffer de escrita."""
+        self._walk(address)
+
+    def _record_miss(self, latency):
+        bucket = min(latency.bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.write(self.miss_histogram, bucket, self.miss_histogram[bucket] + 1)
+
+    def state(self):
+        lists = [self.mshr_line, self.mshr_ready, self.miss_histogram]
+        for cache in self.caches:
+            lists.extend(cache.state())
+        return lists
+
+    def histogram(self):
+        """Histograma de latencia de faltas como {'min-max': contagem}."""
+        result = {}
+        for bucket, count in enumerate(self.miss_histogram):
+            if count:
+                low = 1 << (bucket - 1) if bucket else 0
+                result[f"{low}-{(1 << bucket) - 1}"] = count
+        return result
+
+    def metrics(self, instructions):
+        """Taxa de acerto e MPKI por nivel, mais o histograma de faltas."""
+        result = {}
+        for cache in self.caches:
+            accesses = cache.accesses
+            result[f"{cache.name}_hit_rate"] = cache.hits / accesses if accesses else 0
+            result[f"{cache.name}_mpki"] = 1000 * cache.misses / instructions if instructions else 0
+        result['miss_latency_hist'] = self.histogram()
+        return result
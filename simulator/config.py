@@ -0,0 +1,221 @@
+"""
+    Configuracao da maquina simulada (geometria do Tomasulo)
+
+    Define tamanho do ROB, numero de registradores, quantidade de estacoes de
+    reserva por classe, a classe de cada operacao e as latencias. Pode ser
+    carregada de JSON ou TOML:
+
+        rob_size = 128
+        num_regs = 64
+        issue_width = 4
+        commit_width = 4
+
+        [rs_counts]
+        Add = 16
+        Mult = 8
+
+        [latencies]
+        DIV = 20
+
+        [initial_memory]
+        100 = 42
+
+        predictor = "gshare"    # not_taken (padrao), taken, bimodal, gshare, tage
+
+        [predictor_options]
+        table_bits = 12
+
+        [[caches]]              # opcional: sem caches, LW usa so a latencia fixa
+        name = "L1"
+        size = 32768
+        assoc = 8
+        line_size = 64
+        latency = 2
+        mshrs = 8
+
+        [[caches]]
+        name = "L2"
+        size = 262144
+        assoc = 8
+        latency = 12
+        policy = "plru"
+
+        fu_policy = "oldest"    # oldest (padrao), station, longest
+
+        [[functional_units]]    # opcional: sem pools, uma "unidade" por estacao
+        name = "Mul"
+        ops = ["MUL"]
+        count = 1
+        pipelined = true
+        initiation_interval = 1
+
+        [[functional_units]]
+        name = "Div"
+        ops = ["DIV"]
+        count = 1
+        pipelined = false
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+
+from .cache import CacheLevel
+from .predictor import make_predictor
+from .units import POLICIES as FU_POLICIES
+from .units import FunctionalUnits, UnitPool
+
+DEFAULT_LATENCIES = {
+    'ADD': 2, 'SUB': 2,
+    'MUL': 4, 'DIV': 10,
+    'LW': 3, 'SW': 2,
+    'BEQ': 1, 'BNE': 1
+}
+
+# Classe (grupo de estacoes de reserva) usada por cada operacao
+DEFAULT_OP_CLASSES = {
+    'ADD': 'Add', 'SUB': 'Add',
+    'LW': 'Add', 'SW': 'Add',
+    'BEQ': 'Add', 'BNE': 'Add',
+    'MUL': 'Mult', 'DIV': 'Mult'
+}
+
+# Momento da recuperacao de predicoes erradas
+RECOVERY_POLICIES = ('commit', 'resolve')
+
+# Valores iniciais para testes
+DEFAULT_INITIAL_REGISTERS = {2: 5, 3: 10, 5: 2, 6: 3}
+
+
+@dataclass
+class MachineConfig:
+    """Parametros da maquina. Os padroes reproduzem o simulador original."""
+
+    rob_size: int = 8
+    num_regs: int = 32
+    # Instrucoes buscadas/emitidas e retiradas por ciclo (largura superescalar)
+    issue_width: int = 1
+    commit_width: int = 1
+    rs_counts: dict = field(default_factory=lambda: {'Add': 3, 'Mult': 2})
+    op_classes: dict = field(default_factory=lambda: dict(DEFAULT_OP_CLASSES))
+    latencies: dict = field(default_factory=lambda: dict(DEFAULT_LATENCIES))
+    initial_registers: dict = field(default_factory=lambda: dict(DEFAULT_INITIAL_REGISTERS))
+    # Conteudo inicial da memoria de dados {endereco: valor} (o resto le 0)
+    initial_memory: dict = field(default_factory=dict)
+    # Hierarquia de caches de dados: lista de niveis (campos de CacheLevel),
+    # do L1 para baixo. Vazia = sem caches (LW custa so latencies['LW'])
+    caches: list = field(default_factory=list)
+    # Latencia da memoria principal quando todos os niveis falham
+    memory_latency: int = 100
+    # Preditor de desvios (ver predictor.PREDICTORS) e parametros do construtor
+    predictor: str = 'not_taken'
+    predictor_options: dict = field(default_factory=dict)
+    # Entradas do BTB (0 = BTB ideal: o alvo de todo desvio e conhecido no issue)
+    btb_entries: int = 0
+    # Quando recuperar de uma predicao errada: 'commit' (desvio chega no HEAD,
+    # flush de tudo) ou 'resolve' (no write_result, descarta so os mais novos)
+    recovery: str = 'commit'
+    # Pools de unidades funcionais: lista de UnitPool (campos como dict).
+    # Vazia = sem limite (cada estacao executa sozinha)
+    functional_units: list = field(default_factory=list)
+    # Quem ganha uma unidade quando ha disputa (ver units.POLICIES)
+    fu_policy: str = 'oldest'
+    # Resultados por ciclo no CDB (0 = ilimitado); com limite, o mais antigo no ROB vence
+    cdb_width: int = 0
+
+    def __post_init__(self):
+        # Chaves vindas de JSON/TOML chegam como string
+        self.initial_registers = {int(r): v for r, v in self.initial_registers.items()}
+        self.initial_memory = {int(a): v for a, v in self.initial_memory.items()}
+        self.validate()
+
+    def validate(self):
+        if self.rob_size < 1:
+            raise ValueError("rob_size deve ser >= 1")
+        if self.num_regs < 1:
+            raise ValueError("num_regs deve ser >= 1")
+        if self.issue_width < 1:
+            raise ValueError("issue_width deve ser >= 1")
+        if self.commit_width < 1:
+            raise ValueError("commit_width deve ser >= 1")
+        if self.cdb_width < 0:
+            raise ValueError("cdb_width deve ser >= 0")
+        for cls, count in self.rs_counts.items():
+            if count < 0:
+                raise ValueError(f"rs_counts[{cls!r}] deve ser >= 0")
+        for op, cls in self.op_classes.items():
+            if self.rs_counts.get(cls, 0) < 1:
+                raise ValueError(f"Operacao {op} usa a classe {cls!r}, que nao tem estacoes")
+        for op, latency in self.latencies.items():
+            if latency < 1:
+                raise ValueError(f"Latencia de {op} deve ser >= 1")
+        if self.memory_latency < 1:
+            raise ValueError("memory_latency deve ser >= 1")
+        if self.btb_entries < 0:
+            raise ValueError("btb_entries deve ser >= 0")
+        if self.recovery not in RECOVERY_POLICIES:
+            raise ValueError(f"recovery deve ser um de {', '.join(RECOVERY_POLICIES)}")
+        make_predictor(self.predictor, self.predictor_options)
+        if self.fu_policy not in FU_POLICIES:
+            raise ValueError(f"fu_policy deve ser um de {', '.join(FU_POLICIES)}")
+        pools = self.unit_pools()
+        names = [pool.name for pool in pools]
+        if len(set(names)) != len(names):
+            raise ValueError("Pools de unidades com nomes repetidos")
+        FunctionalUnits(pools)
+        levels = self.cache_levels()
+        names = [level.name for level in levels]
+        if len(set(names)) != len(names):
+            raise ValueError("Niveis de cache com nomes repetidos")
+
+    def cache_levels(self):
+        """Niveis de cache como CacheLevel (valida cada um)."""
+        return [CacheLevel(**level) for level in self.caches]
+
+    def unit_pools(self):
+        """Pools de unidades funcionais como UnitPool (valida cada um)."""
+        return [UnitPool(**pool) for pool in self.functional_units]
+
+    def station_names(self):
+        """Nomes das estacoes na ordem do engine (Add1, Add2, ..., Mult1, ...)."""
+        return [(cls, f"{cls}{i + 1}")
+                for cls, count in self.rs_counts.items()
+                for i in range(count)]
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Cria a configuracao a partir de um dict; chaves ausentes usam o padrao.
+
+        Para os dicionarios (latencias, classes, estacoes), os valores informados
+        sao mesclados sobre os padroes. Em rs_counts as classes padrao vem
+        primeiro (Add1.., Mult1..) e as novas depois, na ordem informada.
+        """
+        data = dict(data)
+        unknown = set(data) - set(cls.__dataclass_fields__)
+        if unknown:
+            raise ValueError(f"Parametros desconhecidos: {', '.join(sorted(unknown))}")
+
+        defaults = cls()
+        if 'latencies' in data:
+            data['latencies'] = {**defaults.latencies, **data['latencies']}
+        if 'op_classes' in data:
+            data['op_classes'] = {**defaults.op_classes, **data['op_classes']}
+        if 'rs_counts' in data:
+            data['rs_counts'] = {**defaults.rs_counts, **data['rs_counts']}
+        return cls(**data)
+
+    @classmethod
+    def load(cls, path):
+        """Carrega a configuracao de um arquivo .json ou .toml."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.toml':
+            import tomllib
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        return cls.from_dict(data)
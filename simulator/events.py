@@ -0,0 +1,101 @@
+"""
+    Log de eventos estruturado do simulador de Tomasulo
+
+    Cada evento e uma tupla tipada (ciclo, estagio, tipo, ROB, PC, op, valores)
+    guardada num buffer circular de capacidade fixa. O texto so e montado
+    quando alguem pede (console da GUI, exportadores), entao o laco principal
+    da simulacao nao formata strings e a memoria do log fica limitada.
+"""
+
+from collections import deque, namedtuple
+from itertools import islice
+
+Event = namedtuple('Event', 'cycle stage kind rob pc op values')
+
+# Tipos de evento
+ISSUE = 'issue'
+DISPATCH = 'dispatch'
+RESOLVE = 'resolve'
+MISPREDICT = 'mispredict'
+COMMIT = 'commit'
+REDIRECT = 'redirect'
+STEP_BACK = 'step_back'
+
+# Capacidade padrao do buffer
+LOG_CAPACITY = 1000
+
+
+def _render_resolve(ev):
+    vj, vk, should_branch, target_pc = ev.values
+    cmp = '==' if ev.op == 'BEQ' else '!='
+    return f"{ev.op} resolvido: {vj}{cmp}{vk}? {should_branch}, ir para PC={target_pc}"
+
+
+_RENDERERS = {
+    ISSUE: lambda ev: f"{ev.op} Despachado em PC={ev.pc}",
+    DISPATCH: lambda ev: f"{ev.op} entrou numa unidade {ev.values[0]}",
+    RESOLVE: _render_resolve,
+    MISPREDICT: lambda ev: f"FLUSH! predicao errada de branch, pulando para PC={ev.pc}",
+    COMMIT: lambda ev: f"{ev.op} Commitado",
+    REDIRECT: lambda ev: f"PC redirecionado para {ev.pc} (Pipeline Flush)",
+    STEP_BACK: lambda ev: f"--- STEP BACK executado. Voltando para Ciclo {ev.cycle} ---",
+}
+
+
+def render(ev):
+    """Monta o texto de um evento."""
+    return _RENDERERS[ev.kind](ev)
+
+
+class EventLog:
+    """Buffer circular de eventos.
+
+    `total` conta todos os eventos ja registrados (inclusive os que sairam do
+    buffer); o historico usa esse contador para desfazer eventos de um ciclo.
+    """
+
+    def __init__(self, capacity=LOG_CAPACITY):
+        self.buffer = deque(maxlen=capacity)
+        self.total = 0
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return iter(self.buffer)
+
+    def append(self, event):
+        self.buffer.append(event)
+        self.total += 1
+
+    def truncate(self, total):
+        """Descarta os eventos registrados depois que o contador era `total`."""
+        while self.total > total and self.buffer:
+            self.buffer.pop()
+            self.total -= 1
+        self.total = min(self.total, total)
+
+    def recent(self, n):
+        """Ultimos n eventos (mais antigo primeiro)."""
+        return list(islice(reversed(self.buffer), n))[::-1]
+
+    def messages(self, n=None):
+        """Textos dos eventos do buffer (ou dos ultimos n)."""
+        events = self.buffer if n is None else self.recent(n)
+        return [render(ev) for ev in events]
+
+    def records(self):
+        """Eventos como dicionarios (para exportar em JSON/CSV)."""
+        return [dict(ev._asdict(), message=render(ev)) for ev in self.buffer]
+
+    def snapshot(self):
+        return (list(self.buffer), self.total)
+
+    def restore(self, snap):
+        events, self.total = snap
+        self.buffer.clear()
+        self.buffer.extend(events)
+
+    def clear(self):
+        self.buffer.clear()
+        self.total = 0
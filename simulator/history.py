@@ -0,0 +1,129 @@
+"""
+    Historico incremental (undo journal) do simulador de Tomasulo
+
+    Em vez de copiar todo o estado a cada ciclo, cada passo guarda apenas:
+    - os escalares do engine (ciclo, PC, head/tail do ROB, contadores...)
+    - a lista de escritas feitas durante o ciclo, como (container, chave, valor antigo)
+
+    Desfazer um passo e reaplicar os valores antigos na ordem inversa, entao
+    o custo por ciclo e proporcional ao que realmente mudou.
+
+    Para historicos limitados, o journal vira um anel com os ultimos passos e
+    o KeyframeStore guarda snapshots completos esparsos; qualquer ciclo
+    anterior e reconstruido a partir do keyframe mais proximo re-simulando
+    para frente.
+"""
+
+from collections import deque
+
+# Marca chaves que nao existiam no container antes da escrita
+MISSING = object()
+
+
+class UndoJournal:
+    """Pilha de passos do historico (um passo por ciclo).
+
+    Com max_steps, guarda apenas os ultimos max_steps passos (anel).
+    """
+
+    def __init__(self, max_steps=None):
+        self.steps = deque(maxlen=max_steps)
+        self._current = None
+
+    def __len__(self):
+        return len(self.steps)
+
+    def begin(self, scalars):
+        """Abre um novo passo guardando os escalares do engine."""
+        self._current = []
+        self.steps.append((scalars, self._current))
+
+    def end(self):
+        """Fecha o passo atual (escritas seguintes nao sao mais registradas)."""
+        self._current = None
+
+    def record(self, container, key, old):
+        """Registra o valor antigo de container[key] no passo atual."""
+        if self._current is not None:
+            self._current.append((container, key, old))
+
+    def undo(self):
+        """Desfaz o ultimo passo e retorna os escalares salvos nele."""
+        scalars, writes = self.steps.pop()
+        for container, key, old in reversed(writes):
+            if old is MISSING:
+                del container[key]
+            else:
+                container[key] = old
+        return scalars
+
+    def clear(self):
+        self.steps.clear()
+        self._current = None
+
+
+class KeyframeStore:
+    """Snapshots completos a cada `interval` ciclos, no maximo `max_keyframes`.
+
+    Quando o limite estoura, o intervalo dobra e os keyframes fora do novo
+    intervalo sao descartados, entao a memoria fica fixa para qualquer duracao.
+    """
+
+    def __init__(self, interval, max_keyframes=64):
+        if interval < 1:
+            raise ValueError("keyframe_interval deve ser >= 1")
+        self.interval = interval
+        self.max_keyframes = max(2, max_keyframes)
+        self.frames = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    def wants(self, cycle):
+        """Diz se um keyframe deve ser gravado no inicio deste ciclo."""
+        return cycle % self.interval == 0 and cycle not in self.frames
+
+    def add(self, cycle, snapshot):
+        self.frames[cycle] = snapshot
+        while len(self.frames) > self.max_keyframes:
+            self.interval *= 2
+            self.frames = {c: snap for c, snap in self.frames.items()
+                           if c % self.interval == 0}
+
+    def nearest(self, cycle):
+        """Retorna (ciclo, snapshot) do keyframe mais recente <= cycle, ou None."""
+        best = None
+        for c in self.frames:
+            if c <= cycle and (best is None or c > best):
+                best = c
+        if best is None:
+            return None
+        return best, self.frames[best]
+
+
+def untracked(container, key, value):
+    """Escrita sem historico (padrao dos modelos fora do engine)."""
+    container[key] = value
+
+
+class TrackedState:
+    """Base para modelos cujo estado mutavel fica em listas planas.
+
+    Toda escrita passa por self.write(lista, indice, valor), que o engine
+    liga ao seu _set: o journal desfaz as escritas no step_back. Snapshots
+    copiam as listas e o restore as sobrescreve em lugar (o journal guarda
+    referencias para elas).
+    """
+
+    write = staticmethod(untracked)
+
+    def state(self):
+        """Listas com todo o estado mutavel."""
+        raise NotImplementedError
+
+    def snapshot(self):
+        return [list(values) for values in self.state()]
+
+    def restore(self, saved):
+        for values, old in zip(self.state(), saved):
+            values[:] = old
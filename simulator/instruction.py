@@ -8,8 +8,8 @@
       - MUL R1 R2 R3
       - DIV R1 R2 R3
     - Memoria:
-      - LW R1 0 R2
-      - SW R1 0 R2
+      - LW R1 0 R2      # R1 = Mem[R2 + 0]   (tambem LW R1 0(R2) ou LOAD)
+      - SW R1 0 R2      # Mem[R2 + 0] = R1   (tambem SW R1 0(R2) ou STORE)
     - Desvios:
       - BEQ R1 R2 3 # se R1==R2, pula 3 instrucoes pra frente
       - BNE R1 R2 3 # se R1!=R2, pula 3 instrucoes pra frente
@@ -22,52 +22,104 @@
         ou None se for invalido ou comentario
     """
 
-def parse_mips(line: str) -> dict:
-    line = line.strip()
-    
-    #Ignora espacos e coments
-    if not line or line.startswith('#'):
+import re
+
+CALC_OPS = ('ADD', 'SUB', 'MUL', 'DIV')
+MEM_OPS = ('LW', 'SW')
+# Nomes alternativos aceitos para as operacoes de memoria
+ALIASES = {'LOAD': 'LW', 'STORE': 'SW'}
+BRANCH_OPS = ('BEQ', 'BNE')
+
+_REGISTER = re.compile(r'^[Rr]\d+$')
+# Nomes de registrador ja validados (o mesmo nome aparece milhoes de vezes)
+_REGISTER_NAMES = {}
+# Forma "offset(Rs)" dos operandos de memoria
+_MEM_OPERAND = re.compile(r'^(-?\d+)\(([Rr]\d+)\)$')
+
+
+def _register(token):
+    name = _REGISTER_NAMES.get(token)
+    if name is None:
+        if not _REGISTER.match(token):
+            raise ValueError(f"Registrador invalido: {token!r}")
+        name = _REGISTER_NAMES[token] = token.upper()
+    return name
+
+
+def _integer(token):
+    try:
+        return int(token)
+    except ValueError:
+        raise ValueError(f"Valor inteiro invalido: {token!r}") from None
+
+
+def parse_line(line: str) -> dict:
+    """
+    Versao estrita do parser: retorna None so para linhas vazias/comentarios
+    e levanta ValueError (com a causa) para instrucoes invalidas.
+
+    Aceita comentarios no fim da linha e operandos de memoria nas formas
+    "LW R1 0 R2" e "LW R1 0(R2)".
+    """
+    line = line.split('#', 1)[0].strip()
+    if not line:
         return None
-    
-    # separa os parametros
+
     particao = line.split()
-    
-    if len(particao) < 4:
-        return None
-    
-    # Para funcionar com minusculo e maiusculo
     op = particao[0].upper()
-    
-    # Operacoes de calculo
-    if op in ['ADD', 'SUB', 'MUL', 'DIV']:
+    op = ALIASES.get(op, op)
+    operandos = particao[1:]
+
+    if op in CALC_OPS:
+        if len(operandos) != 3:
+            raise ValueError(f"{op} espera 3 operandos (Rd Rs Rt)")
         return {
             'op': op,
-            'dest': particao[1],
-            'reg1': particao[2],
-            'reg2': particao[3],
+            'dest': _register(operandos[0]),
+            'reg1': _register(operandos[1]),
+            'reg2': _register(operandos[2]),
             'estado': 'espera'
         }
-    
-    # Operacoes de Memoria
-    if op in ['LW', 'SW']:
+
+    if op in MEM_OPS:
+        if len(operandos) == 2:
+            match = _MEM_OPERAND.match(operandos[1])
+            if not match:
+                raise ValueError(f"Operando de memoria invalido: {operandos[1]!r}")
+            offset, base = match.groups()
+        elif len(operandos) == 3:
+            offset, base = operandos[1], operandos[2]
+        else:
+            raise ValueError(f"{op} espera Rt offset Rs ou Rt offset(Rs)")
+        rt = _register(operandos[0])
         return {
             'op': op,
-            'dest': particao[1],
-            'reg1': particao[3],
-            'reg2': 'R0',
-            'offset': particao[2],
+            'dest': rt,
+            'reg1': _register(base),
+            # SW le Rt (o dado a gravar); LW so depende da base
+            'reg2': rt if op == 'SW' else 'R0',
+            'offset': str(_integer(offset)),
             'estado': 'espera'
         }
-    
-    # Operacoes de desvio
-    if op in ['BEQ', 'BNE']:
+
+    if op in BRANCH_OPS:
+        if len(operandos) != 3:
+            raise ValueError(f"{op} espera 3 operandos (Rs Rt offset)")
         return {
             'op': op,
-            'reg1': particao[1],
-            'reg2': particao[2],
-            'offset': int(particao[3]),
+            'reg1': _register(operandos[0]),
+            'reg2': _register(operandos[1]),
+            'offset': _integer(operandos[2]),
             'dest': 'R0',
             'estado': 'espera'
         }
-    
-    return None
+
+    raise ValueError(f"Operacao desconhecida: {particao[0]!r}")
+
+
+def parse_mips(line: str) -> dict:
+    """Versao tolerante: retorna None para linhas vazias, comentarios ou invalidas."""
+    try:
+        return parse_line(line)
+    except ValueError:
+        return None
@@ -0,0 +1,118 @@
+"""
+    Carregador de programas .asm
+
+    Le o arquivo linha a linha (sem readlines), ja decodificando cada
+    instrucao, e reporta erros com arquivo e numero da linha. Os programas
+    decodificados ficam num cache indexado por caminho + mtime + tamanho,
+    entao recarregar/resetar o mesmo arquivo nao custa nada. O cache e dono
+    dos programas: um .tbin descartado (arquivo mudou ou saiu do LRU) tem o
+    mapeamento fechado.
+
+    Arquivos .tbin (ver binfmt) sao mapeados em memoria em vez de montados.
+"""
+
+import os
+from collections import OrderedDict
+
+from .instruction import parse_line
+from .program import decode
+
+# Quantos programas o cache padrao guarda
+CACHE_SIZE = 16
+
+
+class AsmError(ValueError):
+    """Erro de montagem com a localizacao no arquivo fonte."""
+
+    def __init__(self, path, lineno, message, text=None):
+        self.path = path
+        self.lineno = lineno
+        self.message = message
+        self.text = text
+        super().__init__(f"{path}:{lineno}: {message}")
+
+
+def iter_asm(path):
+    """Gera (numero_da_linha, DecodedInstruction) lendo o arquivo em streaming."""
+    pc = 0
+    with open(path, 'r') as f:
+        for lineno, line in enumerate(f, 1):
+            try:
+                parsed = parse_line(line)
+                if parsed is None:
+                    continue
+                inst = decode(parsed, pc)
+            except ValueError as e:
+                raise AsmError(path, lineno, str(e), line.rstrip('\n')) from None
+            pc += 1
+            yield lineno, inst
+
+
+def assemble(path):
+    """Monta o arquivo inteiro numa lista de instrucoes decodificadas."""
+    return [inst for _, inst in iter_asm(path)]
+
+
+def read_program(path):
+    """Le `path` sem cache: .tbin e mapeado, qualquer outro arquivo e montado."""
+    if path.lower().endswith('.tbin'):
+        from .binfmt import load_binary
+        return load_binary(path)
+    return assemble(path)
+
+
+class ProgramCache:
+    """Cache LRU de programas decodificados, invalidado por mtime/tamanho."""
+
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+
+        cached = self._entries.get(path)
+        if cached is not None and cached[0] == key:
+            self._entries.move_to_end(path)
+            return cached[1]
+
+        program = read_program(path)
+        if cached is not None:
+            # O arquivo mudou: a versao antiga sai do cache
+            _close(cached[1])
+        self._entries[path] = (key, program)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            _close(self._entries.popitem(last=False)[1][1])
+        return program
+
+    def clear(self):
+        for _, program in self._entries.values():
+            _close(program)
+        self._entries.clear()
+
+
+def _close(program):
+    # Programas .tbin mantem o arquivo mapeado aberto ate serem descartados
+    close = getattr(program, 'close', None)
+    if close is not None:
+        close()
+
+
+_default_cache = ProgramCache()
+
+
+def load_program(path, cache=True):
+    """Retorna o programa decodificado de `path` (do cache, se nao mudou).
+
+    O programa retornado e compartilhado pelo cache: nao modifique a lista
+    nem feche o programa (o cache fecha os .tbin que descarta).
+    """
+    if not cache:
+        return read_program(path)
+    return _default_cache.get(path)
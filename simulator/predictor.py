@@ -0,0 +1,290 @@
+"""
+    Preditores de desvio e BTB
+
+    O issue pergunta ao preditor se o desvio vai ser tomado e, se sim, busca
+    o alvo no BTB; o commit treina o preditor com o resultado real. Todos
+    seguem a mesma interface:
+
+        taken, info = predictor.predict(pc)
+        predictor.update(pc, taken, info)     # no commit do desvio
+
+    `info` e o que o preditor precisa para treinar as mesmas entradas usadas
+    na predicao (ex.: o historico global naquele momento); o engine guarda
+    esse valor na entrada do ROB. O historico global so avanca no commit
+    (nao e especulativo), entao desvios em voo ao mesmo tempo enxergam o
+    mesmo historico.
+
+    Preditores disponiveis (MachineConfig.predictor):
+    - not_taken / taken: estaticos (not_taken e o comportamento original)
+    - bimodal: tabela de contadores de 2 bits indexada pelo PC
+    - gshare: contadores indexados por PC xor historico global
+    - tage: TAGE reduzido (base bimodal + tabelas com tag e historicos
+      geometricos; o provedor e a tabela de maior historico que casa)
+"""
+
+from .history import TrackedState, untracked
+
+
+def _counter(table, index, taken, maximum, write):
+    """Atualiza um contador saturado de 0..maximum."""
+    value = table[index]
+    if taken:
+        if value < maximum:
+            write(table, index, value + 1)
+    elif value > 0:
+        write(table, index, value - 1)
+
+
+def _fold(history, length, bits):
+    """Dobra os `length` bits mais recentes do historico em `bits` bits (xor)."""
+    history &= (1 << length) - 1
+    folded = 0
+    mask = (1 << bits) - 1
+    while history:
+        folded ^= history & mask
+        history >>= bits
+    return folded
+
+
+class BranchPredictor(TrackedState):
+    """Interface dos preditores de direcao."""
+
+    name = None
+
+    def __init__(self, write=untracked):
+        self.write = write
+
+    def predict(self, pc):
+        raise NotImplementedError
+
+    def update(self, pc, taken, info):
+        raise NotImplementedError
+
+    def state(self):
+        return []
+
+
+class StaticPredictor(BranchPredictor):
+    """Sempre a mesma predicao."""
+
+    def __init__(self, taken=False, write=untracked):
+        super().__init__(write)
+        self.taken = taken
+        self.name = 'taken' if taken else 'not_taken'
+
+    def predict(self, pc):
+        return self.taken, None
+
+    def update(self, pc, taken, info):
+        pass
+
+
+class BimodalPredictor(BranchPredictor):
+    """Contadores de 2 bits indexados pelos bits baixos do PC."""
+
+    name = 'bimodal'
+
+    def __init__(self, table_bits=10, write=untracked):
+        super().__init__(write)
+        self.mask = (1 << table_bits) - 1
+        # Comeca fracamente nao tomado
+        self.counters = [1] * (1 << table_bits)
+
+    def predict(self, pc):
+        return self.counters[pc & self.mask] >= 2, None
+
+    def update(self, pc, taken, info):
+        _counter(self.counters, pc & self.mask, taken, 3, self.write)
+
+    def state(self):
+        return [self.counters]
+
+
+class GsharePredictor(BranchPredictor):
+    """Contadores de 2 bits indexados por PC xor historico global."""
+
+    name = 'gshare'
+
+    def __init__(self, table_bits=12, history_bits=12, write=untracked):
+        super().__init__(write)
+        self.table_bits = table_bits
+        self.mask = (1 << table_bits) - 1
+        self.history_bits = history_bits
+        self.counters = [1] * (1 << table_bits)
+        # Historico global (lista de um elemento para passar pelo journal)
+        self.history = [0]
+
+    def _index(self, pc, history):
+        return (pc ^ _fold(history, self.history_bits, self.table_bits)) & self.mask
+
+    def predict(self, pc):
+        history = self.history[0]
+        return self.counters[self._index(pc, history)] >= 2, history
+
+    def update(self, pc, taken, info):
+        _counter(self.counters, self._index(pc, info), taken, 3, self.write)
+        history = ((self.history[0] << 1) | taken) & ((1 << self.history_bits) - 1)
+        self.write(self.history, 0, history)
+
+    def state(self):
+        return [self.counters, self.history]
+
+
+class TagePredictor(BranchPredictor):
+    """TAGE reduzido.
+
+    Uma base bimodal e N tabelas com tag, cada uma indexada por PC xor um
+    historico global de comprimento geometrico. A predicao vem da tabela de
+    maior historico cuja tag casa (provedor); sem nenhuma, vem da base. Num
+    erro, uma entrada e alocada numa tabela de historico maior que o do
+    provedor, entre as entradas com contador de utilidade zerado (em rodizio,
+    para dois contextos que colidem numa tabela nao se expulsarem para sempre).
+    """
+
+    name = 'tage'
+
+    def __init__(self, base_bits=10, table_bits=9, tag_bits=8,
+                 history_lengths=(4, 8, 16, 32), write=untracked):
+        super().__init__(write)
+        if list(history_lengths) != sorted(history_lengths) or not history_lengths:
+            raise ValueError("history_lengths deve ser crescente e nao vazio")
+        self.base_mask = (1 << base_bits) - 1
+        self.base = [1] * (1 << base_bits)
+
+        self.table_bits = table_bits
+        self.table_mask = (1 << table_bits) - 1
+        self.tag_bits = tag_bits
+        self.tag_mask = (1 << tag_bits) - 1
+        self.lengths = tuple(history_lengths)
+        self.max_length = self.lengths[-1]
+
+        size = 1 << table_bits
+        # Por tabela: tag (-1 = vazia), contador de 3 bits (>= 4 = tomado), utilidade de 2 bits
+        self.tags = [[-1] * size for _ in self.lengths]
+        self.ctrs = [[4] * size for _ in self.lengths]
+        self.useful = [[0] * size for _ in self.lengths]
+        self.history = [0]
+        # Rodizio da escolha de tabela na alocacao
+        self.tick = [0]
+
+    def _lookup(self, pc, history):
+        """(indice, tag) de cada tabela para este PC e historico."""
+        result = []
+        for length in self.lengths:
+            index = (pc ^ _fold(history, length, self.table_bits) ^ (pc >> self.table_bits)) & self.table_mask
+            tag = (pc ^ _fold(history, length, self.tag_bits) * 3) & self.tag_mask
+            result.append((index, tag))
+        return result
+
+    def _providers(self, pc, history):
+        """Tabelas cuja tag casa, da de maior historico para a menor."""
+        slots = self._lookup(pc, history)
+        matches = [t for t in range(len(self.lengths) - 1, -1, -1)
+                   if self.tags[t][slots[t][0]] == slots[t][1]]
+        return slots, matches
+
+    def predict(self, pc):
+        history = self.history[0]
+        slots, matches = self._providers(pc, history)
+        if matches:
+            t = matches[0]
+            return self.ctrs[t][slots[t][0]] >= 4, history
+        return self.base[pc & self.base_mask] >= 2, history
+
+    def update(self, pc, taken, info):
+        write = self.write
+        slots, matches = self._providers(pc, info)
+        base_index = pc & self.base_mask
+        base_pred = self.base[base_index] >= 2
+
+        if matches:
+            provider = matches[0]
+            index = slots[provider][0]
+            pred = self.ctrs[provider][index] >= 4
+            if len(matches) > 1:
+                alt = matches[1]
+                alt_pred = self.ctrs[alt][slots[alt][0]] >= 4
+            else:
+                alt_pred = base_pred
+            # A entrada foi util se acertou onde a alternativa errou
+            if pred != alt_pred:
+                _counter(self.useful[provider], index, pred == taken, 3, write)
+            _counter(self.ctrs[provider], index, taken, 7, write)
+        else:
+            provider = -1
+            pred = base_pred
+            _counter(self.base, base_index, taken, 3, write)
+
+        if pred != taken:
+            self._allocate(provider, slots, taken)
+
+        history = ((self.history[0] << 1) | taken) & ((1 << self.max_length) - 1)
+        write(self.history, 0, history)
+
+    def _allocate(self, provider, slots, taken):
+        """Aloca uma entrada numa tabela de historico maior que o do provedor."""
+        write = self.write
+        longer = range(provider + 1, len(self.lengths))
+        free = [t for t in longer if self.useful[t][slots[t][0]] == 0]
+        if free:
+            tick = self.tick[0]
+            t = free[tick % len(free)]
+            index, tag = slots[t]
+            write(self.tags[t], index, tag)
+            write(self.ctrs[t], index, 4 if taken else 3)
+            write(self.tick, 0, tick + 1)
+            return
+        # Nenhuma livre: envelhece as candidatas para abrir espaco depois
+        for t in longer:
+            index = slots[t][0]
+            write(self.useful[t], index, self.useful[t][index] - 1)
+
+    def state(self):
+        return [self.base, self.history, self.tick, *self.tags, *self.ctrs, *self.useful]
+
+
+class BTB(TrackedState):
+    """Branch target buffer mapeado diretamente (PC -> alvo)."""
+
+    def __init__(self, entries, write=untracked):
+        if entries < 1:
+            raise ValueError("btb_entries deve ser >= 1")
+        self.write = write
+        self.entries = entries
+        self.tags = [-1] * entries
+        self.targets = [0] * entries
+
+    def lookup(self, pc):
+        """Alvo guardado para o PC, ou None se ele nao esta no BTB."""
+        index = pc % self.entries
+        if self.tags[index] == pc:
+            return self.targets[index]
+        return None
+
+    def update(self, pc, target):
+        index = pc % self.entries
+        self.write(self.tags, index, pc)
+        self.write(self.targets, index, target)
+
+    def state(self):
+        return [self.tags, self.targets]
+
+
+PREDICTORS = {
+    'not_taken': lambda write, **options: StaticPredictor(False, write=write, **options),
+    'taken': lambda write, **options: StaticPredictor(True, write=write, **options),
+    'bimodal': lambda write, **options: BimodalPredictor(write=write, **options),
+    'gshare': lambda write, **options: GsharePredictor(write=write, **options),
+    'tage': lambda write, **options: TagePredictor(write=write, **options),
+}
+
+
+def make_predictor(name, options=None, write=untracked):
+    """Cria o preditor `name` com as opcoes (parametros do construtor)."""
+    factory = PREDICTORS.get(name)
+    if factory is None:
+        raise ValueError(f"Preditor desconhecido: {name!r} (use {', '.join(PREDICTORS)})")
+    try:
+        return factory(write, **(options or {}))
+    except TypeError as e:
+        raise ValueError(f"Opcoes invalidas para o preditor {name!r}: {e}") from None
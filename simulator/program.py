@@ -0,0 +1,131 @@
+"""
+    Programa pre-decodificado
+
+    A saida de parse_mips (dicts com strings) e compilada uma unica vez numa
+    lista de DecodedInstruction: codigo de operacao inteiro, indices de
+    registradores ja convertidos e alvo de desvio resolvido. O engine consome
+    esses registros direto, sem reinterpretar strings a cada issue (nem a
+    cada re-issue depois de um flush).
+"""
+
+# Codigos de operacao
+OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_LW, OP_SW, OP_BEQ, OP_BNE = range(8)
+OP_NAMES = ('ADD', 'SUB', 'MUL', 'DIV', 'LW', 'SW', 'BEQ', 'BNE')
+OP_CODES = {name: code for code, name in enumerate(OP_NAMES)}
+
+BRANCH_OPS = frozenset((OP_BEQ, OP_BNE))
+# Operacoes que nao escrevem no registrador destino
+NO_WRITE_OPS = frozenset((OP_BEQ, OP_BNE, OP_SW))
+
+
+_REGISTER_INDEX = {}
+
+
+def parse_register(name):
+    """'R12' -> 12; levanta ValueError para nomes invalidos."""
+    index = _REGISTER_INDEX.get(name)
+    if index is None:
+        if not name or name[0] not in 'Rr' or not name[1:].isdigit():
+            raise ValueError(f"Registrador invalido: {name!r}")
+        index = _REGISTER_INDEX[name] = int(name[1:])
+    return index
+
+
+class DecodedInstruction:
+    """Uma instrucao ja decodificada.
+
+    dest/src1/src2 sao indices de registradores; target e o PC de destino
+    (so para desvios). Aceita acesso estilo dict ('op', 'dest', 'reg1',
+    'reg2', 'offset') para quem ainda le a forma textual (GUI).
+    """
+
+    __slots__ = ('pc', 'op', 'name', 'dest', 'src1', 'src2', 'offset',
+                 'target', 'writes_reg', 'is_branch')
+
+    def __init__(self, pc, op, dest, src1, src2, offset=0, target=None):
+        self.pc = pc
+        self.op = op
+        self.name = OP_NAMES[op]
+        self.dest = dest
+        self.src1 = src1
+        self.src2 = src2
+        self.offset = offset
+        self.target = target
+        self.writes_reg = op not in NO_WRITE_OPS
+        self.is_branch = op in BRANCH_OPS
+
+    def __getitem__(self, key):
+        if key == 'op':
+            return self.name
+        if key == 'dest':
+            return f"R{self.dest}"
+        if key == 'reg1':
+            return f"R{self.src1}"
+        if key == 'reg2':
+            return f"R{self.src2}"
+        if key == 'offset':
+            return self.offset
+        raise KeyError(key)
+
+    def __str__(self):
+        if self.is_branch:
+            return f"{self.name} R{self.src1} R{self.src2} {self.offset}"
+        if self.op in (OP_LW, OP_SW):
+            return f"{self.name} R{self.dest} {self.offset} R{self.src1}"
+        return f"{self.name} R{self.dest} R{self.src1} R{self.src2}"
+
+    def __repr__(self):
+        return f"<{self.pc}: {self}>"
+
+
+def decode(instruction, pc):
+    """Decodifica um dict de parse_mips que esta no endereco `pc`."""
+    name = instruction['op']
+    if name not in OP_CODES:
+        raise ValueError(f"Operacao desconhecida: {name!r}")
+    op = OP_CODES[name]
+
+    dest = parse_register(instruction['dest'])
+    src1 = parse_register(instruction['reg1'])
+    src2 = parse_register(instruction['reg2'])
+
+    offset = instruction.get('offset', 0)
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise ValueError(f"Offset invalido: {offset!r}") from None
+
+    target = None
+    if op in BRANCH_OPS:
+        target = pc + 1 + offset
+        if target < 0:
+            raise ValueError(f"Desvio em PC={pc} para fora do programa (PC={target})")
+    return DecodedInstruction(pc, op, dest, src1, src2, offset, target)
+
+
+def decode_program(instructions):
+    """Compila a lista de parse_mips (ignorando None) numa lista decodificada."""
+    program = []
+    for inst in instructions:
+        if inst is not None:
+            program.append(decode(inst, len(program)))
+    return program
+
+
+def is_decoded(program):
+    """Diz se a sequencia ja e um programa decodificado."""
+    return len(program) == 0 or isinstance(program[0], DecodedInstruction)
+
+
+def max_register(program):
+    """Maior indice de registrador usado pelo programa (-1 se vazio)."""
+    if len(program) == 0:
+        return -1
+    # Programas mapeados (.tbin) trazem o valor no cabecalho
+    stored = getattr(program, 'max_reg', None)
+    if stored is not None:
+        return stored
+    highest = -1
+    for inst in program:
+        highest = max(highest, inst.dest, inst.src1, inst.src2)
+    return highest
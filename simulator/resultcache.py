@@ -0,0 +1,148 @@
+"""
+    Cache persistente de resultados de simulacao (SQLite)
+
+    Guarda as metricas de cada execucao (programa x configuracao) num banco
+    SQLite, para que sweeps repetidos e reexecucoes de CI so simulem as
+    combinacoes que mudaram. A chave e o SHA-256 de:
+    - o digest do programa decodificado (binfmt.program_digest: mudar um
+      comentario do .asm nao invalida nada; mudar uma instrucao, sim)
+    - a MachineConfig completa (to_dict; rs_counts como lista de pares, ja
+      que a ordem das classes muda a maquina)
+    - o limite de ciclos
+    - a versao do modelo de tempo (tomasulo_engine.ENGINE_VERSION)
+
+    O banco guarda no maximo `max_entries` resultados; ao passar disso, os
+    usados ha mais tempo sao removidos. As escritas sao gravadas em lote
+    (ver ResultCache), entao feche o cache (ou use `with`) ao terminar.
+
+    Use:
+        with ResultCache('resultados.sqlite') as cache:
+            key = cache.key(program, config, max_cycles)
+            result = cache.get(key)
+            if result is None:
+                ...
+                cache.put(key, result)
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from .binfmt import program_digest
+from .tomasulo_engine import ENGINE_VERSION
+
+# Resultados guardados por padrao antes de descartar os menos usados
+MAX_ENTRIES = 100_000
+# Operacoes (get com acerto ou put) entre dois commits
+COMMIT_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    used INTEGER NOT NULL
+)
+"""
+
+
+def result_key(digest, config, max_cycles):
+    """Chave de um resultado: digest do programa + config + limite + versao."""
+    config = config.to_dict()
+    # A ordem das classes define os indices das estacoes (arbitragem e
+    # desempate do CDB), entao nao pode ser apagada pelo sort_keys
+    config['rs_counts'] = list(config['rs_counts'].items())
+    data = {'program': digest, 'config': config,
+            'max_cycles': max_cycles, 'engine': ENGINE_VERSION}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Resultados de simulacao em SQLite, com descarte dos menos usados.
+
+    As escritas ficam numa transacao aberta, gravada a cada COMMIT_EVERY
+    operacoes, em commit() e ao fechar (um sweep grava uma vez no fim), em
+    vez de um fsync por get/put.
+    """
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser >= 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.execute(_SCHEMA)
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+        # Relogio logico de uso (continua de onde o banco parou)
+        self._clock = self._db.execute("SELECT COALESCE(MAX(used), 0) FROM results").fetchone()[0]
+        # Linhas no banco: contadas so aqui, depois mantidas a cada insercao/remocao
+        self._count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self._pending = 0
+        # O banco pode ter sido criado com um limite maior
+        self._evict()
+        self._db.commit()
+
+    def __len__(self):
+        return self._count
+
+    def key(self, program, config, max_cycles):
+        return result_key(program_digest(program), config, max_cycles)
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _wrote(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def get(self, key):
+        """Resultado guardado (dict) ou None."""
+        row = self._db.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE results SET used = ? WHERE key = ?", (self._tick(), key))
+        self._wrote()
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """Guarda um resultado (JSON) e descarta os excedentes menos usados."""
+        values = (json.dumps(result), self._tick(), key)
+        try:
+            self._db.execute("INSERT INTO results (result, used, key) VALUES (?, ?, ?)", values)
+            self._count += 1
+        except sqlite3.IntegrityError:
+            self._db.execute("UPDATE results SET result = ?, used = ? WHERE key = ?", values)
+        self._evict()
+        self._wrote()
+
+    def _evict(self):
+        excess = self._count - self.max_entries
+        if excess > 0:
+            cursor = self._db.execute("DELETE FROM results WHERE key IN "
+                                      "(SELECT key FROM results ORDER BY used LIMIT ?)", (excess,))
+            self._count -= cursor.rowcount
+
+    def commit(self):
+        """Grava as escritas pendentes no banco."""
+        self._db.commit()
+        self._pending = 0
+
+    def clear(self):
+        self._db.execute("DELETE FROM results")
+        self._count = 0
+        self.commit()
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
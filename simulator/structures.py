@@ -0,0 +1,81 @@
+"""
+    Estruturas compactas do simulador de Tomasulo
+
+    Estacoes de reserva e entradas do ROB usam __slots__: cada campo e um
+    atributo de tamanho fixo, sem dicionario por objeto, e o acesso nos
+    estagios e um acesso de atributo em vez de busca por chave string.
+
+    Para compatibilidade (GUI e codigo antigo), os objetos tambem aceitam
+    acesso por chave: rs['busy'] equivale a rs.busy.
+"""
+
+
+class _Slots:
+    __slots__ = ()
+
+    # Visao de compatibilidade estilo dict
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def snapshot(self):
+        """Valores de todos os campos, na ordem de __slots__."""
+        return tuple([getattr(self, name) for name in self.__slots__])
+
+    def restore(self, values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ReservationStation(_Slots):
+    """Uma estacao de reserva."""
+
+    __slots__ = ('name', 'busy', 'op', 'vj', 'vk', 'qj', 'qk', 'dest',
+                 'cycles', 'rob_index', 'pc_when_issued', 'unit')
+
+    def __init__(self, name):
+        self.name = name
+        self.busy = False
+        self.op = None
+        self.vj = 0
+        self.vk = 0
+        self.qj = None
+        self.qk = None
+        self.dest = None
+        self.cycles = 0
+        self.rob_index = None
+        self.pc_when_issued = None
+        # Unidade funcional em uso (None = esperando unidade ou sem pools)
+        self.unit = None
+
+
+class ROBEntry(_Slots):
+    """Uma entrada do buffer de reordenamento."""
+
+    __slots__ = ('busy', 'instruction', 'estado', 'value', 'dest',
+                 'should_branch', 'target_pc', 'address',
+                 'predicted_taken', 'prediction', 'checkpoint', 'recovered')
+
+    def __init__(self):
+        self.busy = False
+        self.instruction = None
+        self.estado = 'espera'
+        self.value = None
+        self.dest = None
+        self.should_branch = False
+        self.target_pc = None
+        # Endereco efetivo de LW/SW (None ate ser calculado)
+        self.address = None
+        # Desvios: direcao prevista no issue e o contexto do preditor para o treino
+        self.predicted_taken = False
+        self.prediction = None
+        # Recuperacao no write_result: reg_status no issue do desvio e se ja
+        # houve a recuperacao (o commit entao so retira o desvio)
+        self.checkpoint = None
+        self.recovered = False
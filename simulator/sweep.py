@@ -0,0 +1,260 @@
+"""
+    Exploracao do espaco de projeto (sweep) do simulador de Tomasulo
+
+    Recebe uma grade de parametros da MachineConfig e uma lista de programas
+    e simula todas as combinacoes (programa x configuracao) num pool de
+    processos, juntando as metricas numa tabela so (uma linha por execucao).
+
+    Os parametros da grade sao campos da MachineConfig; campos que sao
+    dicionarios aceitam uma chave com ponto (ex.: rs_counts.Add,
+    latencies.MUL). A configuracao base (--config) vale para o que a grade
+    nao muda.
+
+    Cada processo decodifica cada programa uma vez so e reaproveita a lista
+    decodificada em todas as configuracoes que receber (as tarefas saem
+    agrupadas por programa, entao um processo tende a ver poucos programas).
+
+    Com --cache, os resultados vao para um banco SQLite (ver resultcache) e
+    so as combinacoes que nao estao la sao simuladas.
+
+    Use:
+        python -m simulator.sweep examples/ -p rob_size=8,16,32 -p rs_counts.Add=2,4
+        python -m simulator.sweep examples/*.asm -p latencies.MUL=4,10 -j 8 -o sweep.csv
+        python main.py sweep examples/ --grid grade.toml -c base.toml -f jsonl
+        python -m simulator.sweep examples/ -p rob_size=8,16 --cache sweep.sqlite
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import FORMATS, MAX_CYCLES, collect_programs, write_results
+from .config import MachineConfig
+from .binfmt import program_digest
+from .loader import AsmError, load_program, read_program
+from .resultcache import MAX_ENTRIES, ResultCache, result_key
+from .tomasulo_engine import TomasuloEngine
+
+# Metricas de cada linha da tabela (padrao do --metrics)
+DEFAULT_METRICS = ('cycles', 'ipc', 'bubbles', 'flushes')
+
+# Tarefas entregues de uma vez a cada processo
+CHUNK_SIZE = 4
+
+# Programas ja decodificados neste processo (por caminho)
+_programs = {}
+
+
+def parse_value(text):
+    """Valor de um parametro na linha de comando: numero, booleano ou string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_param(text):
+    """'nome=v1,v2,...' -> (nome, [v1, v2, ...])."""
+    name, sep, values = text.partition('=')
+    if not sep or not name or not values:
+        raise ValueError(f"Parametro invalido: {text!r} (use nome=v1,v2,...)")
+    return name.strip(), [parse_value(v.strip()) for v in values.split(',')]
+
+
+def load_grid(path):
+    """Le uma grade {parametro: [valores]} de um arquivo .json ou .toml."""
+    if os.path.splitext(path)[1].lower() == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            grid = tomllib.load(f)
+    else:
+        with open(path, 'r') as f:
+            grid = json.load(f)
+    # Um valor solto vale como lista de um elemento
+    return {name: values if isinstance(values, list) else [values]
+            for name, values in grid.items()}
+
+
+def apply_params(base, params):
+    """Nova MachineConfig com os parametros (nome ou campo.chave) sobre a base."""
+    data = base.to_dict()
+    for name, value in params.items():
+        field_name, _, key = name.partition('.')
+        if field_name not in data:
+            raise ValueError(f"Parametro desconhecido: {name}")
+        if key:
+            if not isinstance(data[field_name], dict):
+                raise ValueError(f"{field_name} nao e um dicionario (parametro {name})")
+            data[field_name] = {**data[field_name], key: value}
+        else:
+            data[field_name] = value
+    return MachineConfig.from_dict(data)
+
+
+def expand_grid(grid, base=None):
+    """Produto cartesiano da grade: lista de (parametros, MachineConfig).
+
+    Combinacoes invalidas levantam ValueError antes de qualquer simulacao.
+    """
+    base = base or MachineConfig()
+    names = list(grid)
+    points = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        try:
+            points.append((params, apply_params(base, params)))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Configuracao invalida {params}: {e}") from None
+    return points
+
+
+def _program(path):
+    program = _programs.get(path)
+    if program is None:
+        program = _programs[path] = read_program(path)
+    return program
+
+
+def run_point(task):
+    """Simula um programa numa configuracao (roda dentro do processo do pool).
+
+    Retorna complete, error e todas as metricas de get_metrics().
+    """
+    path, config, max_cycles = task
+    engine = TomasuloEngine(config, record_history=False, log_events=False,
+                            event_driven=True)
+    try:
+        engine.load_program(_program(path))
+    except (AsmError, ValueError, OSError) as e:
+        return {'complete': False, 'error': str(e)}
+
+    metrics = engine.run_until_complete(max_cycles)
+    return {'complete': engine.is_complete(), 'error': None, **metrics}
+
+
+def _row(path, params, result, metrics):
+    row = {'program': path, **params, 'complete': result['complete'], 'error': result['error']}
+    row.update({name: result.get(name) for name in metrics})
+    return row
+
+
+def _keys(programs, points, max_cycles):
+    """Chave do cache de cada tarefa (None se o programa nao carrega)."""
+    keys = []
+    for path in programs:
+        try:
+            # O digest so depende do programa: calculado uma vez por arquivo
+            digest = program_digest(load_program(path))
+        except (AsmError, ValueError, OSError):
+            digest = None
+        keys.extend(None if digest is None else result_key(digest, config, max_cycles)
+                    for _, config in points)
+    return keys
+
+
+def sweep(programs, grid, base=None, workers=None, max_cycles=MAX_CYCLES,
+          metrics=DEFAULT_METRICS, cache=None):
+    """Gera as linhas da tabela, na ordem programa x ponto da grade.
+
+    workers=1 simula no proprio processo (sem pool). Com um ResultCache, as
+    combinacoes guardadas nao sao simuladas e as novas sao gravadas nele.
+    """
+    points = expand_grid(grid, base)
+    tasks = [(path, params, config) for path in programs for params, config in points]
+    keys = _keys(programs, points, max_cycles) if cache is not None else [None] * len(tasks)
+
+    cached = [cache.get(key) if key is not None else None for key in keys]
+    pending = [(path, config, max_cycles)
+               for (path, _, config), result in zip(tasks, cached) if result is None]
+
+    if workers == 1 or not pending:
+        yield from _merge(tasks, keys, cached, map(run_point, pending), cache, metrics)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(run_point, pending, chunksize=CHUNK_SIZE)
+        yield from _merge(tasks, keys, cached, results, cache, metrics)
+
+
+def _merge(tasks, keys, cached, results, cache, metrics):
+    """Linhas na ordem das tarefas: do cache ou do proximo resultado simulado."""
+    for (path, params, _), key, result in zip(tasks, keys, cached):
+        if result is None:
+            result = next(results)
+            # Erros de carga nao entram no cache (o arquivo pode ser corrigido)
+            if key is not None and result['error'] is None:
+                cache.put(key, result)
+        yield _row(path, params, result, metrics)
+    if cache is not None:
+        # Um commit por sweep (alem dos periodicos do proprio cache)
+        cache.commit()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m simulator.sweep",
+        description="Simula programas numa grade de configuracoes da maquina, em paralelo."
+    )
+    parser.add_argument('paths', nargs='+', help="arquivos .asm/.tbin ou diretorios")
+    parser.add_argument('-p', '--param', action='append', default=[],
+                        help="parametro da grade: nome=v1,v2,... (ex.: rob_size=8,16, "
+                             "latencies.MUL=4,10); pode repetir")
+    parser.add_argument('-g', '--grid',
+                        help="grade em arquivo .json/.toml ({parametro: [valores]})")
+    parser.add_argument('-c', '--config',
+                        help="configuracao base da maquina (.json ou .toml)")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="processos no pool (padrao: numero de CPUs; 1 = sem pool)")
+    parser.add_argument('-m', '--metrics', nargs='+', default=list(DEFAULT_METRICS),
+                        help=f"metricas na tabela (padrao: {' '.join(DEFAULT_METRICS)})")
+    parser.add_argument('-f', '--format', choices=FORMATS, default='csv',
+                        help="formato de saida (padrao: csv)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="arquivo de saida (padrao: stdout)")
+    parser.add_argument('--max-cycles', type=int, default=MAX_CYCLES,
+                        help=f"limite de ciclos por execucao (padrao: {MAX_CYCLES})")
+    parser.add_argument('--cache',
+                        help="banco SQLite de resultados: so simula o que nao esta nele")
+    parser.add_argument('--cache-size', type=int, default=MAX_ENTRIES,
+                        help=f"resultados guardados no cache (padrao: {MAX_ENTRIES})")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    programs = collect_programs(args.paths)
+    if not programs:
+        print("Nenhum programa .asm/.tbin encontrado!", file=sys.stderr)
+        return 1
+
+    try:
+        grid = load_grid(args.grid) if args.grid else {}
+        grid.update(parse_param(text) for text in args.param)
+        base = MachineConfig.load(args.config) if args.config else MachineConfig()
+        # Valida a grade inteira antes de abrir o pool
+        expand_grid(grid, base)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    cache = ResultCache(args.cache, args.cache_size) if args.cache else None
+    rows = sweep(programs, grid, base, args.jobs, args.max_cycles, args.metrics, cache)
+    try:
+        if args.output == '-':
+            write_results(rows, sys.stdout, args.format)
+        else:
+            with open(args.output, 'w', newline='') as out:
+                write_results(rows, out, args.format)
+    finally:
+        if cache is not None:
+            print(f"Cache: {cache.hits} reaproveitados, {cache.misses} simulados",
+                  file=sys.stderr)
+            cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
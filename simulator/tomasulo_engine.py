@@ -1,44 +1,209 @@
-import copy
+import heapq
+from collections import deque
+from itertools import islice
 
-# Definicoes iniciais
-numRegs = 32 # Numero de registradores
+from . import events
+from .cache import MemoryHierarchy
+from .config import MachineConfig
+from .events import Event, EventLog
+from .history import MISSING, KeyframeStore, UndoJournal
+from .predictor import BTB, make_predictor
+from .program import (OP_ADD, OP_BEQ, OP_DIV, OP_LW, OP_MUL, OP_NAMES, OP_SUB, OP_SW,
+                      decode_program, is_decoded, max_register)
+from .structures import ReservationStation, ROBEntry
+from .units import FunctionalUnits
+
+# Versao do modelo de tempo do engine: incremente quando uma mudanca alterar
+# ciclos ou metricas de algum programa (invalida o cache de resultados)
+ENGINE_VERSION = 4
+
+# Categorias da pilha de CPI: cada ciclo conta em uma só, pelo commit
+# - base: commitou alguma instrução
+# - fu / execute / memory / cdb: o HEAD (cujos operandos já vieram de
+#   instruções commitadas) espera uma unidade funcional, a latência da operação, a hierarquia de caches (LW)
+#   ou a vez de escrever no CDB (fim da execução, disputa do barramento ou
+#   LW esperando um SW mais antigo)
+# - flush_refill: desde o commit de um desvio mal previsto (flush ou já
+#   recuperado no write_result) nenhuma instrução commitou
+# - frontend: ROB vazio sem flush pendente (início do programa)
+CPI_CATEGORIES = ('base', 'fu', 'execute', 'memory', 'cdb', 'flush_refill', 'frontend')
+(CPI_BASE, CPI_FU, CPI_EXECUTE, CPI_MEMORY, CPI_CDB,
+ CPI_FLUSH_REFILL, CPI_FRONTEND) = range(len(CPI_CATEGORIES))
+
+# Motivos de bolha no issue (depois vem um contador por classe de estações):
+# ROB cheio, fim do programa, e classe cheia com alguma estação esperando
+# operandos (hazard de dados); classe cheia só com estações executando conta
+# como hazard estrutural daquela classe. STALL_FLUSH_REFILL conta à parte
+# (fora das bolhas) os ciclos da janela de reabastecimento: desde um
+# flush/recuperação até o primeiro commit novo, como flush_refill no CPI
+STALL_ROB_FULL, STALL_PC_EXHAUSTED, STALL_OPERANDS, STALL_FLUSH_REFILL = range(4)
+STALL_CLASSES = 4
 
 class TomasuloEngine:
     """
     Simulador do algoritmo de Tomasulo.
+
+    A geometria (ROB, estacoes, registradores, latencias) vem de um
+    MachineConfig; sem config, usa a maquina original (3 Add, 2 Mult, ROB 8).
+
+    Historico (para step_back / goto_cycle):
+    - history_depth: quantos ciclos recentes ficam no journal (None = todos)
+    - keyframe_interval: grava um snapshot completo a cada N ciclos, permitindo
+      voltar para qualquer ciclo com memoria fixa (None = sem keyframes)
+    - max_keyframes: limite de keyframes guardados (o intervalo e dobrado ao estourar)
+
+    Modo rapido (varreduras/benchmarks, so interessa get_metrics()):
+    - record_history=False: nao grava journal nem keyframes (sem step_back)
+    - log_events=False: nao registra eventos de log
+    - event_driven=True: run_until_complete() pula direto os ciclos em que
+      nada muda alem das contagens de latencia (so sem historico)
+
+    O log (self.events) e um buffer circular de log_capacity eventos.
+
+    Memoria de dados: self.memory e esparsa ({endereco: valor}, o resto le 0).
+    LW/SW em voo ficam na load/store queue (self.lsq) em ordem de programa,
+    e cada um guarda sua posicao nela (self.lsq_seq), entao um LW percorre
+    so os LW/SW mais antigos que ele. Um LW so le quando todo SW mais
+    antigo ja tem endereco: se algum casa
+    com o seu, recebe o dado direto do SW mais novo (forwarding), senao le a
+    memoria. SW so escreve na memoria no commit. Com caches configuradas
+    (config.caches), a leitura na memoria leva a latencia devolvida pela
+    hierarquia, somada a latencies['LW'] (calculo do endereco).
+
+    Desvios: o issue segue a predicao de config.predictor (alvo vindo do BTB).
+    Com recovery='commit', o erro e tratado quando o desvio chega ao HEAD
+    (flush de tudo). Com recovery='resolve', no write_result que resolve o
+    desvio: so as entradas mais novas sao descartadas e o reg_status volta
+    ao checkpoint salvo no issue do desvio.
+
+    Superescalar: ate config.issue_width instrucoes emitidas e
+    config.commit_width retiradas por ciclo, sempre em ordem de programa.
+
+    Contabilidade de ciclos: todo ciclo sem issue e classificado (ROB
+    cheio, classe de estacoes cheia, operandos, fim do programa) e todo ciclo entra numa
+    categoria de CPI_CATEGORIES pelo que o commit viu; get_metrics() traz as
+    duas decomposicoes.
+
+    Unidades funcionais (config.functional_units): uma estacao com operandos
+    prontos espera em self.fu_waiting ate o execute() lhe dar uma unidade
+    do pool da operacao (escolhida por config.fu_policy).
     """
     
-    def __init__(self):
-        # Para salvar stepbacks
-        self.history = []
+    def __init__(self, config=None, history_depth=None, keyframe_interval=None, max_keyframes=64,
+                 record_history=True, log_events=True, log_capacity=events.LOG_CAPACITY,
+                 event_driven=False):
+        if config is None:
+            config = MachineConfig()
+
+        # Opcoes preservadas pelo reset()
+        self._options = {
+            'config': config,
+            'history_depth': history_depth,
+            'keyframe_interval': keyframe_interval,
+            'max_keyframes': max_keyframes,
+            'record_history': record_history,
+            'log_events': log_events,
+            'log_capacity': log_capacity,
+            'event_driven': event_driven,
+        }
+        self.record_history = record_history
+        self.log_events = log_events
+        self.event_driven = event_driven
+
+        # Sem histórico as escritas vão direto para o estado
+        if not record_history:
+            self._set = self._set_untracked
+            self._setf = setattr
+            keyframe_interval = None
+
+        # Para salvar stepbacks (guarda so as escritas de cada ciclo)
+        self.history = UndoJournal(history_depth)
+        self.keyframes = KeyframeStore(keyframe_interval, max_keyframes) if keyframe_interval else None
         
+        self.config = config
+        self.rob_size = config.rob_size
+        self.num_regs = config.num_regs
+
         # Latencia de cada oper
-        self.LATENCIAS = {
-            'ADD': 2, 'SUB': 2,
-            'MUL': 4, 'DIV': 10,
-            'LW': 3, 'SW': 2,
-            'BEQ': 1, 'BNE': 1
-        }
+        self.LATENCIAS = dict(config.latencies)
         
-        # Estacao de Reserva (5 total: 3 Add/Sub, 2 Mult/Div)
-        self.rs = [
-            {'name': 'Add1', 'busy': False, 'op': None, 'vj': 0, 'vk': 0, 'qj': None, 'qk': None, 'dest': None, 'cycles': 0, 'rob_index': None, 'pc_when_issued': None},
-            {'name': 'Add2', 'busy': False, 'op': None, 'vj': 0, 'vk': 0, 'qj': None, 'qk': None, 'dest': None, 'cycles': 0, 'rob_index': None, 'pc_when_issued': None},
-            {'name': 'Add3', 'busy': False, 'op': None, 'vj': 0, 'vk': 0, 'qj': None, 'qk': None, 'dest': None, 'cycles': 0, 'rob_index': None, 'pc_when_issued': None},
-            {'name': 'Mult1', 'busy': False, 'op': None, 'vj': 0, 'vk': 0, 'qj': None, 'qk': None, 'dest': None, 'cycles': 0, 'rob_index': None, 'pc_when_issued': None},
-            {'name': 'Mult2', 'busy': False, 'op': None, 'vj': 0, 'vk': 0, 'qj': None, 'qk': None, 'dest': None, 'cycles': 0, 'rob_index': None, 'pc_when_issued': None},
-        ]
+        # Estacoes de Reserva, agrupadas por classe (padrao: 3 Add/Sub, 2 Mult/Div)
+        self.rs = []
+        self.rs_class = []
+        self.rs_by_class = {}
+        for cls, name in config.station_names():
+            self.rs_by_class.setdefault(cls, []).append(len(self.rs))
+            self.rs_class.append(cls)
+            self.rs.append(ReservationStation(name))
+
+        # Classe de estacoes que cada operacao usa
+        self.op_class = dict(config.op_classes)
+
+        # Tabelas indexadas pelo codigo da operacao decodificada
+        self.op_latency = [self.LATENCIAS.get(name, 1) for name in OP_NAMES]
+        self.op_class_of = [self.op_class.get(name) for name in OP_NAMES]
+
+        # Escalonamento (estado derivado das RS, reconstruido apos step_back):
+        # - free_rs: heap de estacoes livres por classe (menor indice primeiro)
+        # - executing: estacoes com operandos prontos contando latencia
+        # - completing: estacoes com latencia cumprida, prontas para o CDB
+        # - consumers: tag do ROB -> estacoes esperando esse resultado
+        # - lsq: indices do ROB dos LW/SW em voo, em ordem de programa
+        # - lsq_seq: posicao absoluta de cada LW/SW na LSQ (por entrada do
+        #   ROB); a do lsq[0] e lsq_base, entao o LW acha sua posicao em O(1)
+        # - fu_waiting: estacoes com operandos prontos esperando unidade funcional
+        # - rs_of_rob: estação de cada entrada do ROB em execução
+        self.free_rs = {}
+        self.rs_of_rob = [None] * config.rob_size
+        self.fu_waiting = set()
+        self.executing = set()
+        self.completing = set()
+        self.consumers = {}
+        self.lsq = deque()
+        self.lsq_seq = [0] * config.rob_size
+        self.lsq_base = 0
+
+        # Pools de unidades funcionais (None = uma unidade por estacao)
+        pools = config.unit_pools()
+        self.units = FunctionalUnits(pools, self._set) if pools else None
+        self.fu_policy = config.fu_policy
+
+        # Largura do CDB (0 = ilimitada)
+        self.cdb_width = config.cdb_width
+        self.cdb_stalls = 0
         
-        # Buffer de Reordenamento (8 entradas)
-        self.rob = [
-            {'busy': False, 'instruction': None, 'estado': 'espera', 'value': None, 'dest': None, 'should_branch': False, 'target_pc': None}
-            for _ in range(8)
-        ]
+        # Buffer de Reordenamento (padrao: 8 entradas)
+        self.rob = [ROBEntry() for _ in range(self.rob_size)]
         self.rob_head = 0  # Aponta para a próxima instrução a ser commitada
         self.rob_tail = 0  # Aponta para a próxima entrada livre
+        self._rebuild_schedule()
         
-        self.registers = [0] * numRegs
-        self.reg_status = [None] * numRegs
+        self.registers = [0] * self.num_regs
+        self.reg_status = [None] * self.num_regs
+
+        # Memoria de dados esparsa
+        self.memory = {}
+        # Hierarquia de caches (None = latencia fixa); escreve pelo journal
+        levels = config.cache_levels()
+        self.hierarchy = MemoryHierarchy(levels, config.memory_latency, self._set) if levels else None
+
+        # Front end: preditor de direcao e BTB (None = BTB ideal)
+        self.predictor = make_predictor(config.predictor, config.predictor_options, self._set)
+        self.btb = BTB(config.btb_entries, self._set) if config.btb_entries else None
+        self.branch_count = 0
+        self.mispredictions = 0
+        self.recover_at_resolve = config.recovery == 'resolve'
+        # Largura superescalar e uso dos slots de issue/commit
+        self.issue_width = config.issue_width
+        self.commit_width = config.commit_width
+        self.issued = 0
+        self.issue_full_cycles = 0
+        self.commit_slots = 0
+        self.commit_full_cycles = 0
+        # Instruções descartadas por flush/recuperação
+        self.squashed = 0
+        self.forwarded_loads = 0
+        self.load_stalls = 0
         
         # Estado da simulação
         self.cycle = 0
@@ -47,328 +212,955 @@ class TomasuloEngine:
         self.instructions_committed = 0
         self.bubble_cycles = 0
         self.flush_count = 0
-        self.log_messages = []
+        self.events = EventLog(log_capacity)
+
+        # Bolhas por motivo (STALL_*), seguidas de uma por classe de RS
+        self.stall_classes = list(self.rs_by_class)
+        self.issue_stalls = [0] * (STALL_CLASSES + len(self.stall_classes))
+        # Ciclos por categoria de CPI_CATEGORIES
+        self.cycle_stack = [0] * len(CPI_CATEGORIES)
+        # Houve flush/recuperação e nenhuma instrução nova commitou desde então
+        self.refilling = False
+
+    @property
+    def log_messages(self):
+        """Textos dos eventos guardados no log (montados sob demanda)."""
+        return self.events.messages()
+
+    def _log(self, stage, kind, rob=None, pc=None, op=None, values=()):
+        """Registra um evento do ciclo atual (numerado a partir de 1)."""
+        self.events.append(Event(self.cycle + 1, stage, kind, rob, pc, op, values))
 
     def create_snapshot(self):
         """Cria um snapshot profundo do estado atual."""
         return {
             'cycle': self.cycle,
             'pc': self.pc,
-            'rs': copy.deepcopy(self.rs),
-            'rob': copy.deepcopy(self.rob),
+            'rs': [rs.snapshot() for rs in self.rs],
+            'rob': [entry.snapshot() for entry in self.rob],
             'rob_head': self.rob_head,
             'rob_tail': self.rob_tail,
             'registers': list(self.registers),      
             'reg_status': list(self.reg_status),    
+            'memory': dict(self.memory),
+            'hierarchy': self.hierarchy.snapshot() if self.hierarchy else None,
+            'predictor': self.predictor.snapshot(),
+            'btb': self.btb.snapshot() if self.btb else None,
+            'units': self.units.snapshot() if self.units else None,
             'instructions_committed': self.instructions_committed,
             'bubble_cycles': self.bubble_cycles,
+            'issue_stalls': list(self.issue_stalls),
+            'cycle_stack': list(self.cycle_stack),
+            'refilling': self.refilling,
             'flush_count': self.flush_count,
-            'log_messages': list(self.log_messages) 
+            'cdb_stalls': self.cdb_stalls,
+            'forwarded_loads': self.forwarded_loads,
+            'load_stalls': self.load_stalls,
+            'branch_count': self.branch_count,
+            'mispredictions': self.mispredictions,
+            'squashed': self.squashed,
+            'issued': self.issued,
+            'issue_full_cycles': self.issue_full_cycles,
+            'commit_slots': self.commit_slots,
+            'commit_full_cycles': self.commit_full_cycles,
+            'events': self.events.snapshot()
         }
 
     def restore_snapshot(self, snap):
         """Restaura o estado a partir de um snapshot."""
         self.cycle = snap['cycle']
         self.pc = snap['pc']
-        self.rs = copy.deepcopy(snap['rs'])
-        self.rob = copy.deepcopy(snap['rob'])
+        for rs, values in zip(self.rs, snap['rs']):
+            rs.restore(values)
+        for entry, values in zip(self.rob, snap['rob']):
+            entry.restore(values)
         self.rob_head = snap['rob_head']
         self.rob_tail = snap['rob_tail']
         self.registers = list(snap['registers'])
         self.reg_status = list(snap['reg_status'])
+        # Em lugar: o journal guarda referencias para o dict da memoria
+        self.memory.clear()
+        self.memory.update(snap['memory'])
+        if self.hierarchy:
+            self.hierarchy.restore(snap['hierarchy'])
+        self.predictor.restore(snap['predictor'])
+        if self.btb:
+            self.btb.restore(snap['btb'])
+        if self.units:
+            self.units.restore(snap['units'])
         self.instructions_committed = snap['instructions_committed']
         self.bubble_cycles = snap['bubble_cycles']
+        # Em lugar: o journal guarda referencias para as listas
+        self.issue_stalls[:] = snap['issue_stalls']
+        self.cycle_stack[:] = snap['cycle_stack']
+        self.refilling = snap['refilling']
         self.flush_count = snap['flush_count']
-        self.log_messages = list(snap['log_messages'])
+        self.cdb_stalls = snap['cdb_stalls']
+        self.forwarded_loads = snap['forwarded_loads']
+        self.load_stalls = snap['load_stalls']
+        self.branch_count = snap['branch_count']
+        self.mispredictions = snap['mispredictions']
+        self.squashed = snap['squashed']
+        self.issued = snap['issued']
+        self.issue_full_cycles = snap['issue_full_cycles']
+        self.commit_slots = snap['commit_slots']
+        self.commit_full_cycles = snap['commit_full_cycles']
+        self.events.restore(snap['events'])
+        self._rebuild_schedule()
+
+    def _rebuild_schedule(self):
+        """Recalcula listas livres e filas de prontos a partir das RS."""
+        self.free_rs = {cls: [] for cls in self.rs_by_class}
+        self.fu_waiting.clear()
+        self.executing.clear()
+        self.completing.clear()
+        self.consumers.clear()
+        for i, rs in enumerate(self.rs):
+            if not rs.busy:
+                self.free_rs[self.rs_class[i]].append(i)
+                continue
+            self.rs_of_rob[rs.rob_index] = i
+            if rs.qj is None and rs.qk is None:
+                if rs.unit is None and self._unit_pool(i) is not None:
+                    self.fu_waiting.add(i)
+                elif rs.cycles > 0:
+                    self.executing.add(i)
+                else:
+                    self.completing.add(i)
+            else:
+                self._add_consumer(i, rs)
+        for heap in self.free_rs.values():
+            heapq.heapify(heap)
+
+        self.lsq = deque(i for i in self._in_flight()
+                         if self.rob[i].instruction.op in (OP_LW, OP_SW))
+        self.lsq_base = 0
+        for pos, i in enumerate(self.lsq):
+            self.lsq_seq[i] = pos
+
+    def _in_flight(self):
+        """Índices do ROB ocupados, do HEAD para o TAIL."""
+        i = self.rob_head
+        while self.rob[i].busy:
+            yield i
+            i = (i + 1) % self.rob_size
+            if i == self.rob_head:
+                break
+
+    def _unit_pool(self, index):
+        """Pool de unidades da operação na estação (None = não precisa de unidade)."""
+        if self.units is None:
+            return None
+        op = self.rob[self.rs[index].rob_index].instruction.op
+        return self.units.pool_of_op[op]
+
+    def _operands_ready(self, index):
+        """Estação com operandos prontos: vai executar ou esperar uma unidade."""
+        if self._unit_pool(index) is None:
+            self.executing.add(index)
+        else:
+            self.fu_waiting.add(index)
+
+    def _add_consumer(self, index, rs):
+        """Indexa a estação pelas tags que ela espera."""
+        if rs.qj is not None:
+            self.consumers.setdefault(rs.qj, []).append(index)
+        if rs.qk is not None and rs.qk != rs.qj:
+            self.consumers.setdefault(rs.qk, []).append(index)
+
+    def _scalars(self):
+        """Escalares do engine salvos no início de cada passo do histórico."""
+        return (self.cycle, self.pc, self.rob_head, self.rob_tail,
+                self.instructions_committed, self.bubble_cycles,
+                self.flush_count, self.cdb_stalls, self.forwarded_loads,
+                self.load_stalls, self.branch_count, self.mispredictions,
+                self.squashed, self.issued, self.issue_full_cycles,
+                self.commit_slots, self.commit_full_cycles, self.refilling,
+                self.events.total)
+
+    def _restore_scalars(self, scalars):
+        (self.cycle, self.pc, self.rob_head, self.rob_tail,
+         self.instructions_committed, self.bubble_cycles,
+         self.flush_count, self.cdb_stalls, self.forwarded_loads,
+         self.load_stalls, self.branch_count, self.mispredictions,
+         self.squashed, self.issued, self.issue_full_cycles,
+         self.commit_slots, self.commit_full_cycles, self.refilling,
+         log_total) = scalars
+        self.events.truncate(log_total)
+
+    def _set(self, container, key, value):
+        """Escreve container[key] registrando o valor antigo no histórico."""
+        old = container[key]
+        if old != value:
+            self.history.record(container, key, old)
+            container[key] = value
+
+    def _setf(self, obj, name, value):
+        """Escreve o atributo obj.name registrando o valor antigo no histórico."""
+        old = getattr(obj, name)
+        if old != value:
+            self.history.record(obj, name, old)
+            setattr(obj, name, value)
+
+    @staticmethod
+    def _set_untracked(container, key, value):
+        container[key] = value
+
+    def _store(self, address, value):
+        """Escreve na memoria (esparsa) registrando o valor antigo no histórico."""
+        old = self.memory.get(address, MISSING)
+        if old != value:
+            self.history.record(self.memory, address, old)
+            self.memory[address] = value
 
     def step(self):
         """Executa um ciclo e salva o histórico."""
-        # Salva o estado ATUAL no histórico antes de modificá-lo
-        self.history.append(self.create_snapshot())
+        if not self.record_history:
+            self.commit()
+            self.write_result()
+            self.execute()
+            self.issue()
+            self.cycle += 1
+            return
+
+        if self.keyframes is not None and self.keyframes.wants(self.cycle):
+            self.keyframes.add(self.cycle, self.create_snapshot())
+
+        # Abre um passo no histórico; as escritas do ciclo são registradas nele
+        self.history.begin(self._scalars())
 
         # Executa a lógica do pipeline
         self.commit()
         self.write_result()
         self.execute()
         self.issue()
+
+        self.history.end()
         
         # Incrementa o ciclo
         self.cycle += 1
 
+    def run_until_complete(self, max_cycles=None):
+        """Executa até o fim (ou até max_cycles ciclos) e retorna get_metrics()."""
+        stop = None if max_cycles is None else self.cycle + max_cycles
+        # Pular ciclos só é seguro sem histórico (step_back é ciclo a ciclo)
+        skip = self.event_driven and not self.record_history
+        while not self.is_complete() and (stop is None or self.cycle < stop):
+            if skip and self._skip_idle_cycles(stop):
+                continue
+            self.step()
+        return self.get_metrics()
+
+    def _idle_cycles(self):
+        """Quantos ciclos a partir de agora só decrementam latências.
+
+        Um ciclo é ocioso quando o commit não tem o que retirar, nenhuma
+        estação está pronta para o CDB e o issue está bloqueado (ou sem
+        instruções). Nessa situação nada muda até a primeira estação em
+        execução zerar sua latência, então os próximos min(cycles) ciclos são
+        idênticos (ou até uma unidade funcional liberar para uma estação
+        que espera por ela). Retorna 0 se o ciclo atual não é ocioso e None
+        se nada mais vai mudar (programa travado).
+        """
+        if self.completing:
+            return 0
+        head = self.rob[self.rob_head]
+        if head.busy and head.estado == 'ready':
+            return 0
+        if self.pc < len(self.instructions) and self._can_issue():
+            return 0
+        idle = None
+        if self.fu_waiting:
+            idle = min(self.units.next_free(self._unit_pool(i)) for i in self.fu_waiting) - self.cycle
+            if idle <= 0:
+                return 0
+        if self.executing:
+            soonest = min(self.rs[i].cycles for i in self.executing)
+            idle = soonest if idle is None else min(idle, soonest)
+        return idle
+
+    def _can_issue(self):
+        op = self.instructions[self.pc].op
+        return bool(self.free_rs.get(self.op_class_of[op])) and not self.rob[self.rob_tail].busy
+
+    def _skip_idle_cycles(self, stop=None):
+        """Avança em bloco os ciclos ociosos; retorna True se pulou algum."""
+        k = self._idle_cycles()
+        if k is None:
+            # Travado: só o contador de ciclos (e de bolhas) anda
+            if stop is None:
+                return False
+            k = stop - self.cycle
+        elif stop is not None:
+            k = min(k, stop - self.cycle)
+        if k <= 1:
+            return False
+
+        # Nada muda nos ciclos pulados: o commit e o issue parariam sempre
+        # pelos mesmos motivos
+        self._count(self.cycle_stack, self._commit_stall(), k)
+        self._issue_stall(k)
+        if self.refilling:
+            self._count(self.issue_stalls, STALL_FLUSH_REFILL, k)
+
+        finished = []
+        for i in self.executing:
+            rs = self.rs[i]
+            rs.cycles -= k
+            if rs.cycles == 0:
+                finished.append(i)
+        for i in finished:
+            self.executing.discard(i)
+            self.completing.add(i)
+        for i in self.fu_waiting:
+            self.units.stall(self._unit_pool(i), k)
+
+        self.cycle += k
+        return True
+
+    def can_step_back(self):
+        """Diz se existe algum ciclo anterior alcançável pelo histórico."""
+        return len(self.history) > 0 or (self.keyframes is not None and self.cycle > 0)
+
     def step_back(self):
         """Volta um ciclo no simulador (Desfaz o último step)."""
-        if not self.history:
+        if self.history:
+            # Desfaz as escritas do último ciclo e restaura as variáveis
+            self._restore_scalars(self.history.undo())
+            self._rebuild_schedule()
+        elif self.keyframes is not None and self.cycle > 0:
+            # Journal esgotado: reconstrói a partir do keyframe mais próximo
+            self._replay_to(self.cycle - 1)
+        else:
             return
         
-        # Pega o último estado salvo
-        last_state = self.history.pop()
-        
-        # Restaura as variáveis
-        self.restore_snapshot(last_state)
-        
         # Adiciona log para feedback visual
-        self.log_messages.append(f"--- STEP BACK executado. Voltando para Ciclo {self.cycle} ---")
+        self.events.append(Event(self.cycle, 'history', events.STEP_BACK, None, None, None, ()))
+
+    def goto_cycle(self, target):
+        """Salta para o ciclo `target` e retorna o ciclo alcançado.
+
+        Para trás usa o journal se ele cobrir a distância, senão restaura o
+        keyframe mais próximo e re-simula. Para frente executa step() até lá
+        (parando antes se a simulação terminar).
+        """
+        target = max(0, target)
+        if target < self.cycle:
+            if self.cycle - target <= len(self.history):
+                while self.cycle > target:
+                    self._restore_scalars(self.history.undo())
+                self._rebuild_schedule()
+            elif self.keyframes is not None:
+                self._replay_to(target)
+            else:
+                raise ValueError(f"Ciclo {target} fora do histórico disponível")
+
+        while self.cycle < target and not self.is_complete():
+            self.step()
+        return self.cycle
+
+    def _replay_to(self, target):
+        """Restaura o keyframe mais próximo de `target` e re-simula até ele."""
+        nearest = self.keyframes.nearest(target)
+        if nearest is None:
+            raise ValueError(f"Nenhum keyframe anterior ao ciclo {target}")
+
+        self.restore_snapshot(nearest[1])
+        # O journal antigo aponta para o estado substituído
+        self.history.clear()
+        while self.cycle < target:
+            self.step()
         
     def reset(self):
         current_instructions = self.instructions
         
-        self.__init__()
+        self.__init__(**self._options)
         
         self.instructions = current_instructions
         
-        # Valores iniciais para testes
-        self.registers[2] = 5   # R2 = 5
-        self.registers[3] = 10  # R3 = 10
-        self.registers[5] = 2   # R5 = 2
-        self.registers[6] = 3   # R6 = 3
+        # Valores iniciais para testes (padrao: R2=5, R3=10, R5=2, R6=3)
+        for reg, value in self.config.initial_registers.items():
+            if reg < self.num_regs:
+                self.registers[reg] = value
+        self.memory.update(self.config.initial_memory)
     
     def load_program(self, instructions):
+        """Carrega um programa (saída de parse_mips ou já decodificado)."""
         self.reset()
-        self.instructions = [inst for inst in instructions if inst is not None]
+        program = instructions if is_decoded(instructions) else decode_program(instructions)
+        highest = max_register(program)
+        if highest >= self.num_regs:
+            raise ValueError(f"Programa usa R{highest}, mas a máquina tem {self.num_regs} registradores")
+        self.instructions = program
+
+    def _read_operand(self, reg):
+        """Retorna (valor, tag) do registrador no momento do issue."""
+        tag = self.reg_status[reg]
+        if tag is None:
+            return self.registers[reg], None
+        # O produtor já passou pelo CDB mas ainda não commitou: o valor está
+        # no ROB (esperar pela tag aqui travaria, o broadcast já aconteceu)
+        entry = self.rob[tag]
+        if entry.estado == 'ready':
+            return entry.value, None
+        return None, tag
     
     def issue(self):
+        """Emite até issue_width instruções em ordem de programa.
+
+        O grupo para na primeira que não pode ser emitida e logo após um
+        desvio previsto como tomado (a busca seguinte é no alvo). Cada
+        instrução do grupo lê o reg_status já renomeado pelas anteriores.
+        """
+        if self.refilling:
+            self._count(self.issue_stalls, STALL_FLUSH_REFILL)
+
+        issued = 0
+        while issued < self.issue_width and self.pc < len(self.instructions):
+            predicted_taken = self._issue_one()
+            if predicted_taken is None:
+                break
+            issued += 1
+            if predicted_taken:
+                break
+
+        if issued == 0:
+            self._issue_stall()
+            return
+        self.issued += issued
+        if issued == self.issue_width:
+            self.issue_full_cycles += 1
+
+    def _issue_stall(self, cycles=1):
+        """Conta `cycles` ciclos em que o issue não emitiu nada, pelo motivo."""
         if self.pc >= len(self.instructions):
+            self._count(self.issue_stalls, STALL_PC_EXHAUSTED, cycles)
             return
-        
+        self.bubble_cycles += cycles
+        if self.rob[self.rob_tail].busy:
+            self._count(self.issue_stalls, STALL_ROB_FULL, cycles)
+            return
+        cls = self.op_class_of[self.instructions[self.pc].op]
+        for i in self.rs_by_class[cls]:
+            rs = self.rs[i]
+            if rs.qj is not None or rs.qk is not None:
+                self._count(self.issue_stalls, STALL_OPERANDS, cycles)
+                return
+        self._count(self.issue_stalls, STALL_CLASSES + self.stall_classes.index(cls), cycles)
+
+    def _count(self, counters, index, cycles=1):
+        self._set(counters, index, counters[index] + cycles)
+
+    def _issue_one(self):
+        """Emite a instrução em self.pc.
+
+        Retorna None se não há RS ou entrada no ROB, senão se o desvio foi
+        previsto como tomado.
+        """
         instruction = self.instructions[self.pc]
-        op = instruction['op']
+        op = instruction.op
         
-        # Seleciona RS livre
-        rs_index = None
-        if op in ['ADD', 'SUB']:
-            for i in range(3):
-                if not self.rs[i]['busy']:
-                    rs_index = i
-                    break
-        elif op in ['MUL', 'DIV']:
-            for i in range(3, 5):
-                if not self.rs[i]['busy']:
-                    rs_index = i
-                    break
-        elif op in ['LW', 'SW']:
-            for i in range(3):
-                if not self.rs[i]['busy']:
-                    rs_index = i
-                    break
-        elif op in ['BEQ', 'BNE']:
-            for i in range(3):
-                if not self.rs[i]['busy']:
-                    rs_index = i
-                    break
+        # Seleciona RS livre da classe da operacao (O(1) pela lista livre)
+        free = self.free_rs.get(self.op_class_of[op])
         
         # Se não há RS ou se o ROB (apontado pelo tail) está ocupado (ROB cheio)
-        if rs_index is None or self.rob[self.rob_tail]['busy']:
-            self.bubble_cycles += 1
-            return
+        if not free or self.rob[self.rob_tail].busy:
+            return None
         
         # Aloca RS
+        rs_index = heapq.heappop(free)
         rs = self.rs[rs_index]
-        rs['busy'] = True
-        rs['op'] = op
-        rs['cycles'] = self.LATENCIAS.get(op, 1)
-        rs['rob_index'] = self.rob_tail
-        rs['pc_when_issued'] = self.pc
-        
-        dest_reg = int(instruction['dest'][1:]) if instruction['dest'] else 0
-        reg1_reg = int(instruction['reg1'][1:]) if instruction['reg1'] else 0
-        reg2_reg = int(instruction['reg2'][1:]) if instruction['reg2'] else 0
-        
-        # Dependencias de reg1
-        if self.reg_status[reg1_reg] is None:
-            rs['vj'] = self.registers[reg1_reg]
-            rs['qj'] = None
-        else:
-            rs['vj'] = None
-            rs['qj'] = self.reg_status[reg1_reg]
-        
-        # Dependencias de reg2
-        if self.reg_status[reg2_reg] is None:
-            rs['vk'] = self.registers[reg2_reg]
-            rs['qk'] = None
-        else:
-            rs['vk'] = None
-            rs['qk'] = self.reg_status[reg2_reg]
+        self._setf(rs, 'busy', True)
+        self._setf(rs, 'op', instruction.name)
+        self._setf(rs, 'cycles', self.op_latency[op])
+        self._setf(rs, 'rob_index', self.rob_tail)
+        self._setf(rs, 'pc_when_issued', self.pc)
+        self.rs_of_rob[self.rob_tail] = rs_index
         
+        # Dependencias de reg1 e reg2
+        vj, qj = self._read_operand(instruction.src1)
+        vk, qk = self._read_operand(instruction.src2)
+        self._setf(rs, 'vj', vj)
+        self._setf(rs, 'qj', qj)
+        self._setf(rs, 'vk', vk)
+        self._setf(rs, 'qk', qk)
+
         # Aloca ROB
         rob_entry = self.rob[self.rob_tail]
-        rob_entry['busy'] = True
-        rob_entry['instruction'] = instruction
-        rob_entry['estado'] = 'executing'
-        rob_entry['dest'] = dest_reg
-        rob_entry['value'] = None
-        rob_entry['should_branch'] = False
-        rob_entry['target_pc'] = None
+        self._setf(rob_entry, 'busy', True)
+        self._setf(rob_entry, 'instruction', instruction)
+        self._setf(rob_entry, 'estado', 'executing')
+        self._setf(rob_entry, 'dest', instruction.dest if instruction.writes_reg else None)
+        self._setf(rob_entry, 'value', None)
+        self._setf(rob_entry, 'should_branch', False)
+        self._setf(rob_entry, 'target_pc', None)
+        self._setf(rob_entry, 'address', None)
+
+        if qj is None and qk is None:
+            self._operands_ready(rs_index)
+        else:
+            self._add_consumer(rs_index, rs)
+
+        # Desvio: segue a predição (se o BTB conhece o alvo)
+        next_pc = self.pc + 1
+        predicted_taken = False
+        prediction = None
+        if instruction.is_branch:
+            predicted_taken, prediction = self.predictor.predict(self.pc)
+            if predicted_taken:
+                target = instruction.target if self.btb is None else self.btb.lookup(self.pc)
+                if target is None:
+                    predicted_taken = False
+                else:
+                    next_pc = target
+        self._setf(rob_entry, 'predicted_taken', predicted_taken)
+        self._setf(rob_entry, 'prediction', prediction)
+        self._setf(rob_entry, 'recovered', False)
+        if instruction.is_branch and self.recover_at_resolve:
+            self._setf(rob_entry, 'checkpoint', tuple(self.reg_status))
         
-        if op not in ['BEQ', 'BNE', 'SW']:
-            self.reg_status[dest_reg] = self.rob_tail
+        if instruction.writes_reg:
+            self._set(self.reg_status, instruction.dest, self.rob_tail)
+        if op == OP_LW or op == OP_SW:
+            self.lsq_seq[self.rob_tail] = self.lsq_base + len(self.lsq)
+            self.lsq.append(self.rob_tail)
         
-        self.pc += 1
-        self.rob_tail = (self.rob_tail + 1) % 8
+        self.pc = next_pc
+        self.rob_tail = (self.rob_tail + 1) % self.rob_size
         
-        self.log_messages.append(f"{op} Despachado em PC={self.pc-1}")
+        if self.log_events:
+            self._log('issue', events.ISSUE, rs.rob_index, instruction.pc, instruction.name)
+        return predicted_taken
     
     def execute(self):
-        for rs in self.rs:
-            if not rs['busy']:
-                continue
-            
-            if rs['qj'] is None and rs['qk'] is None:
-                if rs['cycles'] > 0:
-                    rs['cycles'] -= 1
+        if self.fu_waiting:
+            self._dispatch_units()
+
+        # Só as estações com operandos prontos contam latência
+        finished = []
+        for i in self.executing:
+            rs = self.rs[i]
+            self._setf(rs, 'cycles', rs.cycles - 1)
+            if rs.cycles == 0:
+                finished.append(i)
+        for i in finished:
+            self.executing.discard(i)
+            self.completing.add(i)
     
+    def _dispatch_units(self):
+        """Entrega unidades livres às estações prontas, na ordem de fu_policy."""
+        head, size = self.rob_head, self.rob_size
+        rs = self.rs
+        if self.fu_policy == 'station':
+            order = sorted(self.fu_waiting)
+        elif self.fu_policy == 'longest':
+            order = sorted(self.fu_waiting,
+                           key=lambda i: (-rs[i].cycles, (rs[i].rob_index - head) % size))
+        else:
+            order = sorted(self.fu_waiting, key=lambda i: (rs[i].rob_index - head) % size)
+
+        for i in order:
+            pool = self._unit_pool(i)
+            unit = self.units.acquire(pool, self.cycle, rs[i].cycles)
+            if unit is None:
+                self.units.stall(pool)
+                continue
+            self._setf(rs[i], 'unit', unit)
+            self.fu_waiting.discard(i)
+            self.executing.add(i)
+            if self.log_events:
+                self._log('execute', events.DISPATCH, rs[i].rob_index, None, rs[i].op,
+                          (self.units.pools[pool].name,))
+
+    def _resolve_load(self, rob_index, address):
+        """Desambiguação de um LW contra os SW mais antigos da LSQ.
+
+        Retorna (valor, encaminhado), ou None se algum SW mais antigo ainda
+        não tem endereço (o LW espera, não pode passar na frente dele).
+        Percorre só as entradas da LSQ antes do LW (posição por lsq_seq), do
+        mais antigo para o mais novo: vale o último SW que casa com o
+        endereço ou que ainda não tem endereço.
+        """
+        rob = self.rob
+        found = None
+        for i in islice(self.lsq, self.lsq_seq[rob_index] - self.lsq_base):
+            entry = rob[i]
+            if entry.instruction.op != OP_SW:
+                continue
+            if entry.address is None or entry.address == address:
+                found = entry
+        if found is not None:
+            if found.address is None:
+                return None
+            return found.value, True
+        return self.memory.get(address, 0), False
+
     def write_result(self):
-        for rs in self.rs:
-            if not rs['busy'] or rs['cycles'] > 0 or rs['qj'] is not None or rs['qk'] is not None:
+        if not self.completing:
+            return
+
+        # CDB ilimitado: ordem das estações, como na varredura original.
+        # Com largura limitada, os mais antigos no ROB ganham o barramento.
+        winners = sorted(self.completing)
+
+        # LWs leem a LSQ como estava no início do ciclo; os bloqueados por um
+        # SW sem endereço ficam esperando (sem ocupar o CDB)
+        loads = {}
+        if self.lsq:
+            ready = []
+            for i in winners:
+                rs = self.rs[i]
+                instruction = self.rob[rs.rob_index].instruction
+                if instruction.op == OP_LW:
+                    entry = self.rob[rs.rob_index]
+                    if entry.address is not None:
+                        # Voltou da hierarquia de caches
+                        loads[i] = self.memory.get(entry.address, 0), False
+                        ready.append(i)
+                        continue
+                    address = rs.vj + instruction.offset
+                    loaded = self._resolve_load(rs.rob_index, address)
+                    if loaded is None:
+                        self.load_stalls += 1
+                        continue
+                    if self.hierarchy is not None and not loaded[1]:
+                        # Sem forwarding: o dado vem das caches, com a latência do acesso
+                        self._setf(entry, 'address', address)
+                        self._setf(rs, 'cycles', self.hierarchy.load(address, self.cycle))
+                        self.completing.discard(i)
+                        self.executing.add(i)
+                        continue
+                    loads[i] = loaded
+                ready.append(i)
+            winners = ready
+
+        if self.cdb_width and len(winners) > self.cdb_width:
+            head, size = self.rob_head, self.rob_size
+            winners.sort(key=lambda i: (self.rs[i].rob_index - head) % size)
+            self.cdb_stalls += len(winners) - self.cdb_width
+            winners = winners[:self.cdb_width]
+
+        for i in winners:
+            rs = self.rs[i]
+            if not rs.busy:
+                # Descartada por uma recuperação neste mesmo ciclo
                 continue
-            
-            op = rs['op']
-            vj = rs['vj']
-            vk = rs['vk']
-            rob_index = rs['rob_index']
+            vj = rs.vj
+            vk = rs.vk
+            rob_index = rs.rob_index
+            instruction = self.rob[rob_index].instruction
+            op = instruction.op
             
             result = 0
             
-            if op == 'ADD':
+            if op == OP_ADD:
                 result = vj + vk
-            elif op == 'SUB':
+            elif op == OP_SUB:
                 result = vj - vk
-            elif op == 'MUL':
+            elif op == OP_MUL:
                 result = vj * vk
-            elif op == 'DIV':
+            elif op == OP_DIV:
                 result = vj // vk if vk != 0 else 0
-            elif op in ['LW', 'SW']:
-                result = vj + vk
-            elif op == 'BEQ':
-                should_branch = (vj == vk)
-                instruction = self.rob[rob_index]['instruction']
-                pc_when_issued = rs['pc_when_issued']
-                target_pc = pc_when_issued + 1 + instruction['offset']
+            elif op == OP_LW:
+                result, forwarded = loads[i]
+                self.forwarded_loads += forwarded
+                self._setf(self.rob[rob_index], 'address', vj + instruction.offset)
+            elif op == OP_SW:
+                # Endereço e dado ficam no ROB até o commit
+                result = vk
+                self._setf(self.rob[rob_index], 'address', vj + instruction.offset)
+            elif instruction.is_branch:
+                should_branch = (vj == vk) if op == OP_BEQ else (vj != vk)
+                target_pc = instruction.target
                 
-                self.rob[rob_index]['should_branch'] = should_branch
-                self.rob[rob_index]['target_pc'] = target_pc
-                result = 0
-                self.log_messages.append(f"BEQ resolvido: {vj}=={vk}? {should_branch}, ir para PC={target_pc}")
-            elif op == 'BNE':
-                should_branch = (vj != vk)
-                instruction = self.rob[rob_index]['instruction']
-                pc_when_issued = rs['pc_when_issued']
-                target_pc = pc_when_issued + 1 + instruction['offset']
-                
-                self.rob[rob_index]['should_branch'] = should_branch
-                self.rob[rob_index]['target_pc'] = target_pc
-                result = 0
-                self.log_messages.append(f"BNE resolvido: {vj}!={vk}? {should_branch}, ir para PC={target_pc}")
+                self._setf(self.rob[rob_index], 'should_branch', should_branch)
+                self._setf(self.rob[rob_index], 'target_pc', target_pc)
+                if self.log_events:
+                    self._log('write_result', events.RESOLVE, rob_index, instruction.pc,
+                              instruction.name, (vj, vk, should_branch, target_pc))
+                entry = self.rob[rob_index]
+                if self.recover_at_resolve and should_branch != entry.predicted_taken:
+                    self.recover(rob_index, target_pc if should_branch else instruction.pc + 1)
             
             # Atualiza ROB
             rob_entry = self.rob[rob_index]
-            rob_entry['value'] = result
-            rob_entry['estado'] = 'ready'
+            self._setf(rob_entry, 'value', result)
+            self._setf(rob_entry, 'estado', 'ready')
             
-            for espera_rs in self.rs:
-                if espera_rs['busy']:
-                    if espera_rs['qj'] == rob_index:
-                        espera_rs['vj'] = result
-                        espera_rs['qj'] = None
-                    if espera_rs['qk'] == rob_index:
-                        espera_rs['vk'] = result
-                        espera_rs['qk'] = None
+            # Broadcast: só acorda as estações indexadas por esta tag (e que
+            # ainda esperam por ela: uma estação pode ter sido reaproveitada)
+            for j in self.consumers.pop(rob_index, ()):
+                espera_rs = self.rs[j]
+                if not espera_rs.busy:
+                    continue
+                matched = False
+                if espera_rs.qj == rob_index:
+                    self._setf(espera_rs, 'vj', result)
+                    self._setf(espera_rs, 'qj', None)
+                    matched = True
+                if espera_rs.qk == rob_index:
+                    self._setf(espera_rs, 'vk', result)
+                    self._setf(espera_rs, 'qk', None)
+                    matched = True
+                if matched and espera_rs.qj is None and espera_rs.qk is None:
+                    self._operands_ready(j)
             
             # Libera a RS atual
-            rs['busy'] = False
-            rs['op'] = None
-            rs['vj'] = 0
-            rs['vk'] = 0
-            rs['qj'] = None
-            rs['qk'] = None
-            rs['dest'] = None
-            rs['cycles'] = 0
+            self.clean_rs(i)
     
     def commit(self):
+        """Retira até commit_width entradas prontas a partir do HEAD."""
+        committed = self.instructions_committed
+        retired = 0
+        while retired < self.commit_width and self._commit_one():
+            retired += 1
+        self.commit_slots += retired
+        if retired == self.commit_width:
+            self.commit_full_cycles += 1
+
+        if self.instructions_committed > committed:
+            self._count(self.cycle_stack, CPI_BASE)
+        else:
+            self._count(self.cycle_stack, self._commit_stall())
+
+    def _commit_stall(self):
+        """Categoria de CPI de um ciclo em que nada commitou."""
+        if self.refilling:
+            return CPI_FLUSH_REFILL
+        head = self.rob[self.rob_head]
+        if not head.busy:
+            return CPI_FRONTEND
+        if head.estado == 'ready':
+            # Pronto mas sem slot: o ciclo foi gasto retirando um desvio errado
+            return CPI_FLUSH_REFILL
+        i = self.rs_of_rob[self.rob_head]
+        if i in self.fu_waiting:
+            return CPI_FU
+        if i in self.completing:
+            return CPI_CDB
+        if head.instruction.op == OP_LW and head.address is not None:
+            return CPI_MEMORY
+        return CPI_EXECUTE
+
+    def _commit_one(self):
+        """Retira a entrada do HEAD se estiver pronta; retorna se retirou."""
         rob_entry = self.rob[self.rob_head]
         
-        if not rob_entry['busy'] or rob_entry['estado'] != 'ready':
-            return
+        if not rob_entry.busy or rob_entry.estado != 'ready':
+            return False
         
-        instruction = rob_entry['instruction']
-        op = instruction['op'] if instruction else None
+        instruction = rob_entry.instruction
+        op = instruction.name
         
-        if op in ['BEQ', 'BNE']:
-            predicted_taken = False 
-            actual_should_branch = rob_entry['should_branch']
+        if instruction.is_branch:
+            actual_should_branch = rob_entry.should_branch
+            self.branch_count += 1
+            self.predictor.update(instruction.pc, actual_should_branch, rob_entry.prediction)
+            if actual_should_branch and self.btb is not None:
+                self.btb.update(instruction.pc, rob_entry.target_pc)
             
-            if actual_should_branch != predicted_taken:
-                # Erro de predição: FLUSH
-                target_pc = rob_entry['target_pc']
-                self.log_messages.append(f"FLUSH! predicao errada de branch, pulando para PC={target_pc}")
+            if actual_should_branch != rob_entry.predicted_taken:
+                self.mispredictions += 1
+                if rob_entry.recovered:
+                    # Já recuperado no write_result: só retira o desvio (como
+                    # no flush, não conta como instrução commitada)
+                    self.clean_rob_entry(rob_entry)
+                    self.rob_head = (self.rob_head + 1) % self.rob_size
+                    self.refilling = True
+                    return True
+                # Erro de predição: FLUSH (volta para o alvo ou para PC+1)
+                target_pc = rob_entry.target_pc if actual_should_branch else instruction.pc + 1
+                if self.log_events:
+                    self._log('commit', events.MISPREDICT, self.rob_head, target_pc, op)
                 self.flush(target_pc)
                 self.flush_count += 1
-                return
+                return True
             
             self.clean_rob_entry(rob_entry)
-            self.rob_head = (self.rob_head + 1) % 8
+            if self.log_events:
+                self._log('commit', events.COMMIT, self.rob_head, instruction.pc, op)
+            self.rob_head = (self.rob_head + 1) % self.rob_size
             self.instructions_committed += 1
-            self.log_messages.append(f"{op} Commitado")
-            return
+            self.refilling = False
+            return True
         
+        if instruction.op == OP_SW:
+            self._store(rob_entry.address, rob_entry.value)
+            if self.hierarchy is not None:
+                self.hierarchy.store(rob_entry.address)
+
+        if self.lsq and self.lsq[0] == self.rob_head:
+            self.lsq.popleft()
+            self.lsq_base += 1
+
         # Instruções normais: Escreve no Register File
-        dest_reg = rob_entry['dest']
-        if dest_reg is not None and dest_reg < numRegs:
-            self.registers[dest_reg] = rob_entry['value']
+        dest_reg = rob_entry.dest
+        if dest_reg is not None and dest_reg < self.num_regs:
+            self._set(self.registers, dest_reg, rob_entry.value)
             if self.reg_status[dest_reg] == self.rob_head:
-                self.reg_status[dest_reg] = None
+                self._set(self.reg_status, dest_reg, None)
         
         self.clean_rob_entry(rob_entry)
         
-        self.rob_head = (self.rob_head + 1) % 8
+        if self.log_events:
+            self._log('commit', events.COMMIT, self.rob_head, instruction.pc, op)
+        self.rob_head = (self.rob_head + 1) % self.rob_size
         self.instructions_committed += 1
-        self.log_messages.append(f"{op} Commitado")
+        self.refilling = False
+        return True
 
     def clean_rob_entry(self, entry):
         """Helper para limpar entrada do ROB"""
-        entry['busy'] = False
-        entry['instruction'] = None
-        entry['estado'] = 'espera'
-        entry['value'] = None
-        entry['dest'] = None
-        entry['should_branch'] = False
-        entry['target_pc'] = None
+        self._setf(entry, 'busy', False)
+        self._setf(entry, 'instruction', None)
+        self._setf(entry, 'estado', 'espera')
+        self._setf(entry, 'value', None)
+        self._setf(entry, 'dest', None)
+        self._setf(entry, 'should_branch', False)
+        self._setf(entry, 'target_pc', None)
+        self._setf(entry, 'address', None)
+        self._setf(entry, 'predicted_taken', False)
+        self._setf(entry, 'prediction', None)
+        self._setf(entry, 'checkpoint', None)
+        self._setf(entry, 'recovered', False)
+
+    def clean_rs(self, index):
+        """Helper para liberar uma RS (e devolvê-la à lista livre)"""
+        rs = self.rs[index]
+        self.fu_waiting.discard(index)
+        self.executing.discard(index)
+        self.completing.discard(index)
+        heapq.heappush(self.free_rs[self.rs_class[index]], index)
+        self._setf(rs, 'busy', False)
+        self._setf(rs, 'op', None)
+        self._setf(rs, 'vj', 0)
+        self._setf(rs, 'vk', 0)
+        self._setf(rs, 'qj', None)
+        self._setf(rs, 'qk', None)
+        self._setf(rs, 'dest', None)
+        self._setf(rs, 'cycles', 0)
+        self._setf(rs, 'unit', None)
+
+    def _station_of(self, rob_index):
+        """Estação ainda ocupada pela entrada do ROB (None se já escreveu no CDB)."""
+        i = self.rs_of_rob[rob_index]
+        if i is not None and self.rs[i].busy and self.rs[i].rob_index == rob_index:
+            return i
+        return None
 
     def flush(self, correct_pc):
-        for rs in self.rs:
-            rs['busy'] = False
-            rs['op'] = None
-            rs['vj'] = 0
-            rs['vk'] = 0
-            rs['qj'] = None
-            rs['qk'] = None
-            rs['dest'] = None
-            rs['cycles'] = 0
-
-        for i in range(8):
-            self.clean_rob_entry(self.rob[i])
+        self.consumers.clear()
+        self.lsq.clear()
+
+        # Só as entradas em voo (HEAD..TAIL) podem ocupar estações ou renomear
+        # registradores, então o custo é proporcional ao que está no ROB
+        i = self.rob_head
+        while self.rob[i].busy:
+            station = self._station_of(i)
+            if station is not None:
+                self.clean_rs(station)
+            entry = self.rob[i]
+            if entry.dest is not None and self.reg_status[entry.dest] == i:
+                self._set(self.reg_status, entry.dest, None)
+            self.clean_rob_entry(entry)
+            if i != self.rob_head:
+                self.squashed += 1
+            i = (i + 1) % self.rob_size
+            if i == self.rob_head:
+                break
             
         self.rob_head = 0
         self.rob_tail = 0
         
-        for i in range(numRegs):
-            self.reg_status[i] = None
-        
         self.pc = correct_pc
+        self.refilling = True
         
-        self.log_messages.append(f"PC redirecionado para {correct_pc} (Pipeline Flush)")
+        if self.log_events:
+            self._log('commit', events.REDIRECT, None, correct_pc)
     
+    def recover(self, branch_index, correct_pc):
+        """Recuperação no write_result: descarta só o que é mais novo que o desvio.
+
+        O reg_status volta ao checkpoint do issue do desvio; tags cujo
+        produtor já commitou (entrada livre no ROB) viram "valor no banco".
+        """
+        size = self.rob_size
+        younger = (self.rob_tail - branch_index - 1) % size
+        squashed = {(branch_index + 1 + k) % size for k in range(younger)}
+
+        dropped = set()
+        for tag in squashed:
+            station = self._station_of(tag)
+            if station is not None:
+                self.clean_rs(station)
+                dropped.add(station)
+            self.consumers.pop(tag, None)
+            self.clean_rob_entry(self.rob[tag])
+        # As estações descartadas também saem dos consumidores das tags mais
+        # antigas, senão seriam acordadas depois de reaproveitadas
+        for tag, waiting in self.consumers.items():
+            if not dropped.isdisjoint(waiting):
+                self.consumers[tag] = [j for j in waiting if j not in dropped]
+        # Os descartados são os mais novos: saem pelo fim da LSQ
+        while self.lsq and self.lsq[-1] in squashed:
+            self.lsq.pop()
+
+        branch = self.rob[branch_index]
+        for reg, tag in enumerate(branch.checkpoint):
+            if tag is not None and not self.rob[tag].busy:
+                tag = None
+            self._set(self.reg_status, reg, tag)
+
+        self._setf(branch, 'recovered', True)
+        self.rob_tail = (branch_index + 1) % size
+        self.pc = correct_pc
+        self.squashed += younger
+        self.flush_count += 1
+
+        if self.log_events:
+            self._log('write_result', events.MISPREDICT, branch_index, correct_pc, branch.instruction.name)
+            self._log('write_result', events.REDIRECT, None, correct_pc)
+
     def is_complete(self):
         pc_done = self.pc >= len(self.instructions)
-        rob_empty = not self.rob[self.rob_head]['busy']
+        rob_empty = not self.rob[self.rob_head].busy
         
         return pc_done and rob_empty
     
     def get_metrics(self):
         ipc = self.instructions_committed / self.cycle if self.cycle > 0 else 0
-        return {
+        metrics = {
             'cycles': self.cycle,
             'instructions': self.instructions_committed,
             'ipc': ipc,
             'bubbles': self.bubble_cycles,
-            'flushes': self.flush_count
-        }
\ No newline at end of file
+            'flushes': self.flush_count,
+            'cdb_stalls': self.cdb_stalls,
+            'forwarded_loads': self.forwarded_loads,
+            'load_stalls': self.load_stalls,
+            'branches': self.branch_count,
+            'mispredictions': self.mispredictions,
+            'branch_accuracy': 1 - self.mispredictions / self.branch_count if self.branch_count else 0,
+            'branch_mpki': 1000 * self.mispredictions / self.instructions_committed if self.instructions_committed else 0,
+            'squashed': self.squashed,
+            'stall_rob_full': self.issue_stalls[STALL_ROB_FULL],
+            'stall_operands': self.issue_stalls[STALL_OPERANDS],
+            'stall_pc_exhausted': self.issue_stalls[STALL_PC_EXHAUSTED],
+            'stall_flush_refill': self.issue_stalls[STALL_FLUSH_REFILL],
+            # Fração dos slots usada e ciclos com o estágio na largura máxima
+            'issue_utilization': self.issued / (self.cycle * self.issue_width) if self.cycle > 0 else 0,
+            'issue_full_cycles': self.issue_full_cycles,
+            'commit_utilization': self.commit_slots / (self.cycle * self.commit_width) if self.cycle > 0 else 0,
+            'commit_full_cycles': self.commit_full_cycles
+        }
+        for k, cls in enumerate(self.stall_classes):
+            metrics[f"stall_rs_full_{cls}"] = self.issue_stalls[STALL_CLASSES + k]
+        # Pilha de CPI: ciclos de cada categoria por instrução (soma = CPI)
+        instructions = self.instructions_committed
+        metrics['cpi_stack'] = {name: cycles / instructions if instructions else 0
+                                for name, cycles in zip(CPI_CATEGORIES, self.cycle_stack)}
+        if self.hierarchy is not None:
+            metrics.update(self.hierarchy.metrics(self.instructions_committed))
+        if self.units is not None:
+            metrics.update(self.units.metrics(self.cycle))
+        return metrics
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+    Unidades funcionais do simulador de Tomasulo
+
+    Sem unidades configuradas, cada estacao de reserva executa sozinha (ha,
+    na pratica, um somador/multiplicador por estacao). Com pools de
+    unidades, uma estacao com operandos prontos ainda precisa ganhar uma
+    unidade livre do pool da sua operacao para comecar a contar latencia.
+
+    Cada pool tem `count` unidades identicas. Uma unidade pipelined aceita
+    uma nova operacao a cada `initiation_interval` ciclos; uma nao pipelined
+    fica ocupada pela latencia inteira da operacao. Operacoes que nao
+    aparecem em nenhum pool continuam sem limite.
+
+    Quando ha mais estacoes prontas do que unidades livres, a politica
+    (MachineConfig.fu_policy) decide quem entra primeiro:
+    - oldest: a mais antiga no ROB
+    - station: a de menor indice (prioridade fixa, como a varredura original)
+    - longest: a de maior latencia restante (desempate pela mais antiga)
+
+    O estado (ciclo em que cada unidade aceita outra operacao e contadores)
+    fica em listas escritas por `write`, entao o journal desfaz no step_back.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+from .history import TrackedState, untracked
+from .program import OP_CODES
+
+POLICIES = ('oldest', 'station', 'longest')
+
+
+@dataclass
+class UnitPool:
+    """Um grupo de unidades funcionais identicas."""
+
+    name: str = 'ALU'
+    ops: list = field(default_factory=lambda: ['ADD', 'SUB'])
+    count: int = 1
+    pipelined: bool = True
+    # Ciclos entre duas operacoes aceitas pela mesma unidade (so pipelined)
+    initiation_interval: int = 1
+
+    def __post_init__(self):
+        self.validate()
+
+    def validate(self):
+        if self.count < 1:
+            raise ValueError(f"{self.name}: count deve ser >= 1")
+        if self.initiation_interval < 1:
+            raise ValueError(f"{self.name}: initiation_interval deve ser >= 1")
+        if not self.ops:
+            raise ValueError(f"{self.name}: ops nao pode ser vazio")
+        for op in self.ops:
+            if op not in OP_CODES:
+                raise ValueError(f"{self.name}: operacao {op!r} desconhecida")
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class FunctionalUnits(TrackedState):
+    """Pools de unidades funcionais e sua ocupacao."""
+
+    def __init__(self, pools, write=untracked):
+        self.pools = pools
+        self.write = write
+
+        # Pool de cada codigo de operacao (None = sem unidade, sem limite)
+        self.pool_of_op = [None] * len(OP_CODES)
+        # Unidades de todos os pools numa lista so: pool p usa first[p]..first[p]+count
+        self.first = []
+        units = 0
+        for p, pool in enumerate(pools):
+            for op in pool.ops:
+                if self.pool_of_op[OP_CODES[op]] is not None:
+                    raise ValueError(f"Operacao {op} aparece em mais de um pool de unidades")
+                self.pool_of_op[OP_CODES[op]] = p
+            self.first.append(units)
+            units += pool.count
+
+        # Ciclo a partir do qual cada unidade aceita uma nova operacao
+        self.free_at = [0] * units
+        # Por pool: operacoes despachadas, ciclos-unidade ocupados, ciclos de estacao esperando
+        self.counters = [0] * (3 * len(pools))
+
+    def acquire(self, pool, cycle, latency):
+        """Reserva uma unidade livre do pool; retorna o indice ou None."""
+        spec = self.pools[pool]
+        free_at = self.free_at
+        start = self.first[pool]
+        for unit in range(start, start + spec.count):
+            if free_at[unit] <= cycle:
+                busy = spec.initiation_interval if spec.pipelined else latency
+                self.write(free_at, unit, cycle + busy)
+                counters = self.counters
+                self.write(counters, 3 * pool, counters[3 * pool] + 1)
+                self.write(counters, 3 * pool + 1, counters[3 * pool + 1] + busy)
+                return unit
+        return None
+
+    def stall(self, pool, cycles=1):
+        """Conta `cycles` ciclos de uma estacao pronta esperando unidade."""
+        counters = self.counters
+        self.write(counters, 3 * pool + 2, counters[3 * pool + 2] + cycles)
+
+    def next_free(self, pool):
+        """Primeiro ciclo em que alguma unidade do pool aceita operacao."""
+        start = self.first[pool]
+        return min(self.free_at[start:start + self.pools[pool].count])
+
+    def state(self):
+        return [self.free_at, self.counters]
+
+    def metrics(self, cycles):
+        """Operacoes, utilizacao e esperas por pool."""
+        result = {}
+        for p, pool in enumerate(self.pools):
+            ops, busy, stalls = self.counters[3 * p:3 * p + 3]
+            result[f"{pool.name}_ops"] = ops
+            result[f"{pool.name}_utilization"] = min(1, busy / (cycles * pool.count)) if cycles else 0
+            result[f"{pool.name}_stalls"] = stalls
+        return result
@@ -0,0 +1,66 @@
+"""Testes do formato compilado (.tbin) e do cache de programas."""
+
+import os
+
+from simulator.binfmt import MappedProgram, compile_asm
+from simulator.loader import ProgramCache
+
+
+def _write_asm(path, lines):
+    path.write_text('\n'.join(lines) + '\n')
+
+
+def test_recompile_keeps_open_mapping_valid(tmp_path):
+    src, dst = tmp_path / 'p.asm', tmp_path / 'p.tbin'
+    _write_asm(src, ['MUL R1 R2 R3', 'SUB R4 R1 R2', 'DIV R5 R4 R3'])
+    compile_asm(str(src), str(dst))
+
+    with MappedProgram(str(dst)) as old:
+        _write_asm(src, ['ADD R7 R6 R5'])
+        assert compile_asm(str(src), str(dst)) == 1
+        # O arquivo antigo continua mapeado, intacto
+        assert [inst.name for inst in old] == ['MUL', 'SUB', 'DIV']
+        with MappedProgram(str(dst)) as new:
+            assert [inst.name for inst in new] == ['ADD']
+    # Sem temporarios sobrando
+    assert set(os.listdir(tmp_path)) == {'p.asm', 'p.tbin'}
+
+
+def test_failed_compile_keeps_target(tmp_path):
+    src, dst = tmp_path / 'p.asm', tmp_path / 'p.tbin'
+    _write_asm(src, ['ADD R1 R2 R3'])
+    compile_asm(str(src), str(dst))
+    _write_asm(src, ['ADD R1 R2 R3', 'FOO R1'])
+    try:
+        compile_asm(str(src), str(dst))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("esperava erro de montagem")
+    assert set(os.listdir(tmp_path)) == {'p.asm', 'p.tbin'}
+    with MappedProgram(str(dst)) as program:
+        assert len(program) == 1
+
+
+def test_program_cache_closes_replaced_and_evicted(tmp_path):
+    paths = []
+    for k in range(3):
+        src, dst = tmp_path / f'p{k}.asm', tmp_path / f'p{k}.tbin'
+        _write_asm(src, ['ADD R1 R2 R3'] * (k + 1))
+        compile_asm(str(src), str(dst))
+        paths.append((src, dst))
+
+    cache = ProgramCache(max_entries=2)
+    first = cache.get(str(paths[0][1]))
+    _write_asm(paths[0][0], ['SUB R1 R2 R3'] * 5)
+    compile_asm(str(paths[0][0]), str(paths[0][1]))
+    second = cache.get(str(paths[0][1]))
+    assert first._map is None
+    assert len(second) == 5
+
+    cache.get(str(paths[1][1]))
+    cache.get(str(paths[2][1]))
+    assert second._map is None
+
+    cache.clear()
+    assert len(cache) == 0
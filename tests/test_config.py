@@ -0,0 +1,22 @@
+"""Testes da MachineConfig (carga de dicionarios e arquivos)."""
+
+from simulator.config import MachineConfig
+
+
+def test_from_dict_merges_rs_counts_over_defaults():
+    config = MachineConfig.from_dict({'rs_counts': {'Add': 16}})
+    assert config.rs_counts == {'Add': 16, 'Mult': 2}
+
+
+def test_from_dict_keeps_default_classes_first():
+    config = MachineConfig.from_dict({'rs_counts': {'Load': 2, 'Mult': 4}})
+    assert list(config.rs_counts) == ['Add', 'Mult', 'Load']
+    assert [name for _, name in config.station_names()][:4] == ['Add1', 'Add2', 'Add3', 'Mult1']
+
+
+def test_toml_with_partial_rs_counts(tmp_path):
+    path = tmp_path / 'maquina.toml'
+    path.write_text("rob_size = 32\n\n[rs_counts]\nAdd = 16\n")
+    config = MachineConfig.load(str(path))
+    assert config.rob_size == 32
+    assert config.rs_counts == {'Add': 16, 'Mult': 2}
@@ -0,0 +1,43 @@
+"""Testes da contabilidade de bolhas do engine (stall_*)."""
+
+import os
+
+import pytest
+
+from simulator.loader import load_program
+from simulator.tomasulo_engine import TomasuloEngine
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), '..', 'examples')
+
+
+def _metrics(name, **options):
+    engine = TomasuloEngine(**options)
+    engine.load_program(load_program(os.path.join(EXAMPLES, name)))
+    return engine.run_until_complete(10_000)
+
+
+def test_issue_stall_reasons_add_up_to_bubbles():
+    metrics = _metrics('long_test2_parallel_pressure.asm')
+    rs_full = sum(v for k, v in metrics.items() if k.startswith('stall_rs_full_'))
+    assert metrics['stall_rob_full'] + metrics['stall_operands'] + rs_full == metrics['bubbles']
+
+
+def test_flush_refill_counts_refill_window():
+    metrics = _metrics('flush.asm')
+    assert metrics['flushes'] == 1
+    assert metrics['stall_flush_refill'] > 0
+    refill = metrics['cpi_stack']['flush_refill'] * metrics['instructions']
+    assert metrics['stall_flush_refill'] == pytest.approx(refill)
+
+
+def test_flush_refill_is_zero_without_mispredictions():
+    metrics = _metrics('test1.asm')
+    assert metrics['flushes'] == 0
+    assert metrics['stall_flush_refill'] == 0
+
+
+@pytest.mark.parametrize('name', ['flush.asm', 'long_test3_branch_storm.asm'])
+def test_flush_refill_same_in_event_driven_mode(name):
+    stepped = _metrics(name)
+    skipped = _metrics(name, record_history=False, log_events=False, event_driven=True)
+    assert skipped['stall_flush_refill'] == stepped['stall_flush_refill']
@@ -0,0 +1,38 @@
+"""Testes do cache persistente de resultados."""
+
+from simulator.config import MachineConfig
+from simulator.resultcache import ResultCache, result_key
+
+
+def test_put_get_and_reopen(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    with ResultCache(path) as cache:
+        cache.put('a', {'cycles': 10})
+        cache.put('a', {'cycles': 11})
+        assert cache.get('a') == {'cycles': 11}
+        assert cache.get('b') is None
+        assert len(cache) == 1
+    # Fechar grava as escritas pendentes
+    with ResultCache(path) as cache:
+        assert len(cache) == 1
+        assert cache.get('a') == {'cycles': 11}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    with ResultCache(str(tmp_path / 'cache.sqlite'), max_entries=2) as cache:
+        cache.put('a', {})
+        cache.put('b', {})
+        cache.get('a')
+        cache.put('c', {})
+        assert len(cache) == 2
+        assert cache.get('b') is None
+        assert cache.get('a') == {} and cache.get('c') == {}
+    with ResultCache(str(tmp_path / 'cache.sqlite'), max_entries=1) as cache:
+        assert len(cache) == 1
+
+
+def test_key_depends_on_station_order():
+    add_first = MachineConfig(rs_counts={'Add': 3, 'Mult': 2})
+    mult_first = MachineConfig(rs_counts={'Mult': 2, 'Add': 3})
+    assert result_key('p', add_first, 100) != result_key('p', mult_first, 100)
+    assert result_key('p', add_first, 100) == result_key('p', MachineConfig(), 100)